@@ -0,0 +1,47 @@
+"""
+Bulk-import a cohort from NDJSON files (one object per line, fields as in app/schemas/bulk_import.py).
+
+    python -m app.bulk_import --users users.ndjson --profiles profiles.ndjson \
+        --cognitive-scores cognitive.ndjson --lifescores lifescores.ndjson
+"""
+import argparse
+import asyncio
+import json
+from typing import List, Optional
+
+from .core.database import db
+from .schemas.bulk_import import BulkImportRequest
+from .services.import_service import BulkImportService
+
+
+def _read_ndjson(path: Optional[str]) -> List[dict]:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def main(args: argparse.Namespace):
+    data = BulkImportRequest(
+        users=_read_ndjson(args.users),
+        profiles=_read_ndjson(args.profiles),
+        cognitive_scores=_read_ndjson(args.cognitive_scores),
+        lifescores=_read_ndjson(args.lifescores),
+    )
+
+    await db.connect()
+    try:
+        result = await BulkImportService(db).import_cohort(data)
+    finally:
+        await db.disconnect()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import users and historical scores")
+    parser.add_argument("--users", help="NDJSON file of users")
+    parser.add_argument("--profiles", help="NDJSON file of profiles")
+    parser.add_argument("--cognitive-scores", help="NDJSON file of cognitive scores")
+    parser.add_argument("--lifescores", help="NDJSON file of LifeScore history rows")
+    asyncio.run(main(parser.parse_args()))
@@ -20,12 +20,55 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = ""
     DB_POOL_SIZE: int = 10
+    # Extra primary pools isolating workloads from the main auth/OLTP pool (name -> size)
+    DB_WORKLOAD_POOLS: dict = {"public": 5, "batch": 3, "export": 2}
     DB_MAX_OVERFLOW: int = 20
+    DB_ACQUIRE_TIMEOUT_SECONDS: float = 10.0
+    # Extra databases sharded by users.id (DATABASE_URL is shard-0); see app/rebalance_shards.py
+    DATABASE_SHARD_URLS: list = []
+    DATABASE_REPLICA_URLS: list = []
+    DB_REPLICA_POOL_SIZE: int = 10
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0
+    DB_EXPORT_PREFETCH: int = 500
+    # Set when DATABASE_URL points at a transaction-mode pooler (pgbouncer, Supabase port 6543)
+    DB_POOLER_MODE: bool = False
+    # Queries slower than this (0 disables) are counted; a sample get EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_SAMPLE_RATE: float = 0.1
+    SLOW_QUERY_BUFFER_SIZE: int = 100
+    SLOW_QUERY_COOLDOWN_SECONDS: float = 60.0
+    SLOW_QUERY_MAX_CONCURRENT_EXPLAINS: int = 1
+    SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS: float = 10.0
+    # EXPLAIN ANALYZE runs the statement; writes are rolled back but still take row locks
+    SLOW_QUERY_EXPLAIN_WRITES: bool = False
     
     # Firebase
     FIREBASE_PROJECT_ID: str = ""
     FIREBASE_CLIENT_EMAIL: str = ""
     FIREBASE_PRIVATE_KEY: str = ""
+    FIREBASE_KEYS_MIN_REFRESH_SECONDS: int = 300
+    FIREBASE_EXECUTOR_WORKERS: int = 4
+    FIREBASE_CALL_TIMEOUT_SECONDS: float = 10.0
+    
+    # Auth caching
+    TOKEN_CACHE_SIZE: int = 10000
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    LAST_LOGIN_INTERVAL_SECONDS: int = 300
+    LAST_LOGIN_FLUSH_SECONDS: int = 30
+    
+    # Activity logging
+    ACTIVITY_LOG_QUEUE_SIZE: int = 10000
+    ACTIVITY_LOG_BATCH_SIZE: int = 500
+    ACTIVITY_LOG_FLUSH_SECONDS: float = 2.0
+    ACTIVITY_LOG_SPILL_PATH: str = "logs/activity_spill.ndjson"
+    # Minimum gap between replays of the spill file after successful writes
+    ACTIVITY_LOG_REPLAY_SECONDS: float = 60.0
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 12
+    ACTIVITY_LOG_PARTITIONS_AHEAD: int = 3
+    ACTIVITY_LOG_MAINTENANCE_HOURS: int = 24
     
     # GitHub
     GITHUB_TOKEN: Optional[str] = None
@@ -33,12 +76,33 @@ class Settings(BaseSettings):
     # Redis (optional)
     REDIS_URL: Optional[str] = None
     
+    # Default per-request time budget (0 disables); per-route overrides live in DeadlineMiddleware
+    REQUEST_DEADLINE_SECONDS: float = 10.0
+    # Upper bound for a single outbound HTTP call (GitHub), further capped by the request budget
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    
+    # How often each worker reloads the in-memory LifeScore rank index from the database
+    RANK_INDEX_REFRESH_SECONDS: float = 300.0
+    
+    # Admission control: concurrent requests per route class, sized from the pools by default
+    # (see app/core/admission.py admission_limits); entries here override single classes
+    ADMISSION_LIMITS: dict = {}
+    ADMISSION_REQUESTS_PER_CONNECTION: int = 2
+    ADMISSION_QUEUE_SIZE: int = 20
+    ADMISSION_MAX_WAIT_SECONDS: float = 0.5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5000"]
     
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    # Tokens charged per request for expensive routes ("METHOD /path" without API prefix)
+    RATE_LIMIT_ROUTE_COSTS: dict = {
+        "POST /portfolio/analyze-github": 10,
+        "POST /lifescore/calculate": 5,
+    }
     
     class Config:
         env_file = "../../.env.local"
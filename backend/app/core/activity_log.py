@@ -0,0 +1,304 @@
+import asyncio
+import ipaddress
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+from ..config.settings import settings
+from ..core.database import Database, db, use_pool
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Queued by stop(): the flush task writes what it has gathered and exits
+_STOP = object()
+
+
+class ActivityLogSink:
+    """
+    Background writer for activity_logs.
+    Requests enqueue rows without waiting; a single task flushes them with binary COPY
+    when the batch is full or the flush interval elapses. Rows that cannot be queued or
+    written go to the spill file, which the task replays once writes succeed again.
+    """
+
+    COLUMNS = [
+        "user_id", "action", "resource_type", "resource_id",
+        "metadata", "ip_address", "user_agent", "created_at",
+    ]
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ACTIVITY_LOG_QUEUE_SIZE)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._last_replay = 0.0
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+
+    def submit(
+        self,
+        user_id: Optional[str],
+        action: str,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ):
+        """Queue one activity row; never blocks the caller"""
+        metadata = dict(metadata) if metadata else None
+
+        # A malformed value would fail the whole COPY batch, so normalise here
+        if resource_id is not None:
+            try:
+                resource_id = str(uuid.UUID(str(resource_id)))
+            except ValueError:
+                metadata = {**(metadata or {}), "resource_id": resource_id}
+                resource_id = None
+
+        if ip_address is not None:
+            try:
+                ip_address = str(ipaddress.ip_address(ip_address))
+            except ValueError:
+                ip_address = None
+
+        record = (
+            user_id,
+            action,
+            resource_type,
+            resource_id,
+            metadata,
+            ip_address,
+            user_agent,
+            datetime.now(timezone.utc),
+        )
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self._spill([record])
+
+    def _spill(self, records: List[tuple]):
+        """Append records to the spill file, or count them as dropped if none is configured"""
+        if not settings.ACTIVITY_LOG_SPILL_PATH:
+            self.dropped += len(records)
+            return
+
+        try:
+            path = Path(settings.ACTIVITY_LOG_SPILL_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a") as spill_file:
+                for record in records:
+                    row = dict(zip(self.COLUMNS, record))
+                    row["created_at"] = row["created_at"].isoformat()
+                    spill_file.write(json.dumps(row) + "\n")
+            self.spilled += len(records)
+        except Exception as e:
+            logger.error(f"Failed to spill {len(records)} activity logs: {e}")
+            self.dropped += len(records)
+
+    def _read_spill(self, path: Path) -> List[tuple]:
+        records = []
+        for line in path.read_text().splitlines():
+            try:
+                row = json.loads(line)
+                row["created_at"] = datetime.fromisoformat(row["created_at"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping malformed line in {path}")
+                continue
+            records.append(tuple(row.get(column) for column in self.COLUMNS))
+        return records
+
+    async def replay_spill(self) -> int:
+        """
+        Write spilled rows back to activity_logs and return how many were read.
+        The spill file is renamed first, so rows spilled meanwhile start a new file;
+        rows that fail again are spilled again. A replay file left by a crash is
+        replayed as is, so its rows may be written twice.
+        """
+        self._last_replay = time.monotonic()
+        if not settings.ACTIVITY_LOG_SPILL_PATH or not self.db.pool:
+            return 0
+
+        path = Path(settings.ACTIVITY_LOG_SPILL_PATH)
+        replay = path.with_name(f"{path.name}.{os.getpid()}.replay")
+        try:
+            if not replay.exists():
+                path.rename(replay)
+            records = self._read_spill(replay)
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.error(f"Failed to read the activity log spill file: {e}")
+            return 0
+
+        await self._write_batches(records)
+        replay.unlink(missing_ok=True)
+        self.replayed += len(records)
+        logger.info(f"Replayed {len(records)} spilled activity logs")
+        return len(records)
+
+    def _replay_due(self) -> bool:
+        return (
+            bool(settings.ACTIVITY_LOG_SPILL_PATH)
+            and time.monotonic() - self._last_replay >= settings.ACTIVITY_LOG_REPLAY_SECONDS
+            and Path(settings.ACTIVITY_LOG_SPILL_PATH).exists()
+        )
+
+    @use_pool("batch")
+    async def _write(self, batch: List[tuple]) -> bool:
+        """COPY one batch, spilling it on failure; True if it was written"""
+        try:
+            async with self.db.get_connection() as conn:
+                await conn.copy_records_to_table(
+                    "activity_logs", records=batch, columns=self.COLUMNS
+                )
+            self.written += len(batch)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} activity logs: {e}")
+            self._spill(batch)
+            return False
+
+    async def _write_batches(self, records: List[tuple]):
+        for i in range(0, len(records), settings.ACTIVITY_LOG_BATCH_SIZE):
+            await self._write(records[i:i + settings.ACTIVITY_LOG_BATCH_SIZE])
+
+    async def _next_batch(self) -> List[tuple]:
+        """
+        Wait for one record, then gather more until the batch is full or the interval passes.
+        Stops early at the stop() marker, which ends the flush loop.
+        """
+        batch = []
+        deadline = None
+
+        while len(batch) < settings.ACTIVITY_LOG_BATCH_SIZE:
+            if deadline is None:
+                record = await self._queue.get()
+                deadline = time.monotonic() + settings.ACTIVITY_LOG_FLUSH_SECONDS
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            if record is _STOP:
+                self._stopping = True
+                break
+            batch.append(record)
+
+        return batch
+
+    async def _run(self):
+        await self.replay_spill()
+        while not self._stopping:
+            batch = await self._next_batch()
+            # A successful write means the database is back: a good time to replay spills
+            if batch and await self._write(batch) and self._replay_due():
+                await self.replay_spill()
+
+    def _drain_queue(self) -> List[tuple]:
+        batch = []
+        while not self._queue.empty():
+            record = self._queue.get_nowait()
+            if record is not _STOP:
+                batch.append(record)
+        return batch
+
+    def start(self):
+        """Start the background flush task"""
+        if not self._task:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Let the flush task write its current batch and exit, then write everything still queued"""
+        if self._task:
+            if not self._task.done():
+                # Blocks while the queue is full; the flush task keeps taking from it
+                await self._queue.put(_STOP)
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Activity log flush task failed: {e}")
+            self._task = None
+
+        await self._write_batches(self._drain_queue())
+
+    def stats(self) -> dict:
+        """Sink counters for health reporting"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+        }
+
+
+class ActivityLogRetention:
+    """Periodic partition maintenance: create upcoming months, drop expired ones"""
+
+    # Arbitrary advisory lock key so only one worker runs maintenance at a time
+    LOCK_KEY = 7_300_101
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._task: Optional[asyncio.Task] = None
+
+    @use_pool("batch")
+    async def run_once(self):
+        """Run one maintenance pass; a no-op if another worker holds the lock"""
+        async with self.db.get_connection() as conn:
+            async with conn.transaction():
+                if not await conn.fetchval("SELECT pg_try_advisory_xact_lock($1)", self.LOCK_KEY):
+                    return
+
+                created = await conn.fetchval(
+                    "SELECT create_activity_log_partitions($1)",
+                    settings.ACTIVITY_LOG_PARTITIONS_AHEAD
+                )
+                dropped = await conn.fetchval(
+                    "SELECT drop_activity_log_partitions($1)",
+                    settings.ACTIVITY_LOG_RETENTION_MONTHS
+                )
+
+        if created or dropped:
+            logger.info(f"Activity log partitions: {created} created, {dropped} dropped")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Activity log partition maintenance failed: {e}")
+            await asyncio.sleep(settings.ACTIVITY_LOG_MAINTENANCE_HOURS * 3600)
+
+    def start(self):
+        """Start the periodic maintenance task"""
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic maintenance task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global activity log sink and retention job
+activity_log_sink = ActivityLogSink(db)
+activity_log_retention = ActivityLogRetention(db)
@@ -0,0 +1,171 @@
+import asyncio
+import json
+from typing import Dict, List, Optional, Tuple
+from ..config.settings import settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def admission_limits() -> Dict[str, int]:
+    """
+    Concurrent requests per route class, sized from the pool each class draws on.
+    Short reads and writes hold a connection for only part of their lifetime (token checks,
+    rendering the response), so ADMISSION_REQUESTS_PER_CONNECTION of them share one
+    connection; reads and writes split the main pool two to one. Heavy jobs and streamed
+    exports hold their connection throughout, so they get one slot per connection of the
+    batch and export pools. ADMISSION_LIMITS overrides single classes.
+    """
+    per_connection = settings.ADMISSION_REQUESTS_PER_CONNECTION
+    pools = settings.DB_WORKLOAD_POOLS
+    main = settings.DB_POOL_SIZE * per_connection
+    writes = max(1, main // 3)
+
+    limits = {
+        "read": max(1, main - writes),
+        "write": writes,
+        # Unconfigured workload pools fall back to the main pool
+        "public": (pools.get("public") or settings.DB_POOL_SIZE) * per_connection,
+        "heavy": pools.get("batch") or 1,
+        "export": pools.get("export") or 1,
+    }
+    limits.update(settings.ADMISSION_LIMITS)
+    return limits
+
+
+class AdmissionClass:
+    """Concurrency limit with a short, bounded wait queue for one class of routes"""
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self, max_wait: float) -> bool:
+        """Take a slot, waiting at most max_wait; False means the request should be shed"""
+        if self._semaphore.locked() and self.waiting >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        # asyncio.timeout, not wait_for: wait_for can time out after the inner acquire
+        # succeeded, and that slot would never be released
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(max_wait):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.limit - self._semaphore._value,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that caps concurrent requests per route class so bursts
+    queue here briefly (or get 503) instead of piling up on the database pool.
+    """
+
+    EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+    # (method, path prefix below the API prefix, class); first match wins
+    ROUTE_CLASSES: List[Tuple[str, str, str]] = [
+        ("POST", "/portfolio/analyze-github", "heavy"),
+        ("POST", "/lifescore/calculate", "heavy"),
+        # Streamed exports hold their slot until the last byte, so they get a class of their own
+        ("GET", "/admin/export", "export"),
+        ("POST", "/admin/import", "heavy"),
+        ("GET", "/lifescore/leaderboard", "public"),
+        ("GET", "/certificate/verify", "public"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+        self.classes: Dict[str, AdmissionClass] = {
+            name: AdmissionClass(name, limit, settings.ADMISSION_QUEUE_SIZE)
+            for name, limit in admission_limits().items()
+        }
+        logger.info(
+            "Admission limits: " + ", ".join(f"{c.name}={c.limit}" for c in self.classes.values())
+        )
+
+        admission_controller.register(self)
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        if path in self.EXEMPT_PATHS or method == "OPTIONS":
+            return None
+
+        for route_method, prefix, name in self.ROUTE_CLASSES:
+            if method == route_method and path.startswith(f"{settings.API_V1_PREFIX}{prefix}"):
+                return name
+
+        return "read" if method in ("GET", "HEAD") else "write"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = self.classify(scope["method"], scope["path"])
+        route_class = self.classes.get(name) if name else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await route_class.acquire(settings.ADMISSION_MAX_WAIT_SECONDS):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_SECONDS).encode()),
+                    (b"content-type", b"application/json"),
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({"detail": "Server busy, please retry"}).encode(),
+            })
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release()
+
+
+class AdmissionController:
+    """Handle for reading admission stats from outside the middleware stack"""
+
+    def __init__(self):
+        self._middleware: Optional[AdmissionControlMiddleware] = None
+
+    def register(self, middleware: AdmissionControlMiddleware):
+        self._middleware = middleware
+
+    def stats(self) -> dict:
+        if not self._middleware:
+            return {}
+        return {name: c.stats() for name, c in self._middleware.classes.items()}
+
+
+# Global admission controller
+admission_controller = AdmissionController()
@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from ..config.settings import settings
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return a live entry without touching LRU order or counters"""
+        entry = self._entries.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Store a value; expires_at is a unix timestamp and defaults to now + ttl"""
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for health/metrics reporting"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class UserRecordCache(LRUCache):
+    """Cache of auth-relevant user rows keyed by firebase_uid, invalidatable by user id"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._uid_by_user_id: Dict[str, str] = {}
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        super().set(key, value, expires_at)
+        self._uid_by_user_id[str(value["id"])] = key
+        if len(self._uid_by_user_id) > 2 * self.maxsize:
+            self._uid_by_user_id = {
+                str(entry[0]["id"]): uid for uid, entry in self._entries.items()
+            }
+
+    def invalidate_user(self, user_id: str):
+        """Drop the cached row for a users.id (after ban, role change or delete)"""
+        firebase_uid = self._uid_by_user_id.pop(str(user_id), None)
+        if firebase_uid is not None:
+            self.invalidate(firebase_uid)
+
+    def clear(self):
+        super().clear()
+        self._uid_by_user_id.clear()
+
+
+# Global user-record cache used by get_current_user
+user_cache = UserRecordCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
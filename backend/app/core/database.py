@@ -1,17 +1,266 @@
+import asyncio
 import asyncpg
-from typing import Optional
-from contextlib import asynccontextmanager
+import bisect
+import functools
+import hashlib
+import inspect
+import orjson
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager, contextmanager
 from ..config.settings import settings
 from ..core.logging import get_logger
+from ..core.queries import NamedQuery, queries, is_write_statement
+from ..core.metrics import metrics, Counter, Gauge, Histogram
+from ..core.responses import json_default
+from ..core.slow_queries import slow_query_sampler
+from ..core import deadline
 
 logger = get_logger(__name__)
 
+DB_ACQUIRE_SECONDS = metrics.register(Histogram(
+    "db_pool_acquire_seconds", "Time spent waiting for a pooled connection", ["pool"]
+))
+DB_QUERY_SECONDS = metrics.register(Histogram(
+    "db_query_seconds", "Query execution time by named query (raw SQL as 'raw')", ["query"]
+))
+DB_TIMEOUTS = metrics.register(Counter(
+    "db_timeouts_total", "Connection acquire and query timeouts", ["stage"]
+))
+DB_ERRORS = metrics.register(Counter(
+    "db_errors_total", "Failed queries by named query", ["query"]
+))
+
+# Set while a @replica_read repository method runs
+_replica_read: ContextVar[bool] = ContextVar("replica_read", default=False)
+
+# Workload pool selected by @use_pool for the current call
+_workload_pool: ContextVar[Optional[str]] = ContextVar("workload_pool", default=None)
+
+# Shard key (a users.id) for the current call, or ALL_SHARDS to scatter-gather
+_shard_key: ContextVar[Optional[str]] = ContextVar("shard_key", default=None)
+ALL_SHARDS = "*"
+
+# Shard pinned by name (use_shard), overriding the shard key, for rows not on their hash shard
+_shard_name: ContextVar[Optional[str]] = ContextVar("shard_name", default=None)
+
+# New users get an id derived from their firebase_uid, so the id (and its shard) is known before insert
+USER_ID_NAMESPACE = uuid.UUID("6f1c1a52-9a2b-4c1e-8d0e-5b4f3a2e7c91")
+
+# Authenticated user of the current request, for read-your-writes routing
+_request_user_id: ContextVar[Optional[str]] = ContextVar("request_user_id", default=None)
+
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def _encode_jsonb(value) -> bytes:
+    # Binary jsonb is a version byte followed by the JSON text
+    return b"\x01" + orjson.dumps(value, default=json_default)
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
+
+def _encode_json(value) -> str:
+    return orjson.dumps(value, default=json_default).decode()
+
+
+def _encode_uuid(value) -> bytes:
+    # Binary, not text: COPY (copy_records_to_table) only speaks the binary format
+    return uuid.UUID(str(value)).bytes
+
+
+def _decode_uuid(data: bytes) -> str:
+    return str(uuid.UUID(bytes=data))
+
+
+def replica_read(method):
+    """
+    Mark a repository method as safe to serve from a read replica.
+    Queries inside it go to a healthy replica unless the request's user wrote recently.
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _replica_read.set(True)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _replica_read.reset(token)
+    return wrapper
+
+
+def use_pool(name: str):
+    """
+    Run a repository method, route or background job on a named workload pool
+    (see DB_WORKLOAD_POOLS) instead of the main pool. Unknown names fall back to the main pool.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            token = _workload_pool.set(name)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                _workload_pool.reset(token)
+        return wrapper
+    return decorator
+
+
+def sharded(arg: str):
+    """
+    Route a repository method's queries to the shard owning the users.id passed as
+    argument `arg`. Without shards configured every query stays on the primary.
+    """
+    def decorator(method):
+        position = list(inspect.signature(method).parameters).index(arg)
+        
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            key = kwargs[arg] if arg in kwargs else args[position]
+            token = _shard_key.set(str(key))
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                _shard_key.reset(token)
+        return wrapper
+    return decorator
+
+
+def all_shards(method):
+    """
+    Run a repository method's queries on every shard concurrently: row lists are
+    concatenated, single rows/values take the first non-null result.
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _shard_key.set(ALL_SHARDS)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _shard_key.reset(token)
+    return wrapper
+
+
+@contextmanager
+def on_shard(user_id: str):
+    """Route queries inside the block to the shard owning user_id"""
+    token = _shard_key.set(str(user_id))
+    try:
+        yield
+    finally:
+        _shard_key.reset(token)
+
+
+@contextmanager
+def use_shard(name: str):
+    """Route queries inside the block to a shard by name ("shard-0" is the primary)"""
+    token = _shard_name.set(name)
+    try:
+        yield
+    finally:
+        _shard_name.reset(token)
+
+
+def user_id_for_uid(firebase_uid: str) -> str:
+    """Deterministic users.id for a new user"""
+    return str(uuid.uuid5(USER_ID_NAMESPACE, firebase_uid))
+
+
+def set_request_user(user_id: Optional[str]):
+    """Record the authenticated user for this request (used for read-your-writes)"""
+    _request_user_id.set(user_id)
+
+
+class Replica:
+    """A read-replica pool and its last measured replication lag"""
+    
+    def __init__(self, name: str, pool: asyncpg.Pool):
+        self.name = name
+        self.pool = pool
+        self.lag: Optional[float] = None
+        self.healthy = False
+    
+    def stats(self) -> dict:
+        return {"lag_seconds": self.lag, "healthy": self.healthy}
+
+
+class ShardRouter:
+    """Consistent-hash ring mapping users.id values to shard names"""
+    
+    VIRTUAL_NODES = 128
+    
+    def __init__(self, names: List[str]):
+        self.names = list(names)
+        ring = sorted(
+            (self._hash(f"{name}#{index}"), name)
+            for name in self.names
+            for index in range(self.VIRTUAL_NODES)
+        )
+        self._points = [point for point, _ in ring]
+        self._owners = [name for _, name in ring]
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+    
+    def shard_for(self, user_id: str) -> str:
+        index = bisect.bisect(self._points, self._hash(str(user_id))) % len(self._points)
+        return self._owners[index]
+
 
 class Database:
     """Database connection manager using asyncpg"""
     
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
+        self.workload_pools: Dict[str, asyncpg.Pool] = {}
+        # Shards beyond the primary ("shard-0"), keyed "shard-1", "shard-2", ...
+        self.shards: Dict[str, asyncpg.Pool] = {}
+        self.shard_router = ShardRouter(["shard-0"])
+        self.replicas: List[Replica] = []
+        self._replica_cursor = 0
+        self._recent_writes: Dict[str, float] = {}
+        self._lag_task: Optional[asyncio.Task] = None
+        self._pool_names: Dict[int, str] = {}
+    
+    def _pools(self) -> Dict[str, asyncpg.Pool]:
+        pools = {"primary": self.pool} if self.pool else {}
+        pools.update(self.workload_pools)
+        pools.update(self.shards)
+        pools.update({replica.name: replica.pool for replica in self.replicas})
+        return pools
+    
+    def _connection_counts(self) -> dict:
+        counts = {}
+        for name, pool in self._pools().items():
+            idle = pool.get_idle_size()
+            counts[(name, "in_use")] = pool.get_size() - idle
+            counts[(name, "idle")] = idle
+        return counts
+    
+    async def _create_pool(self, dsn: str, max_size: int) -> asyncpg.Pool:
+        # Registered queries run through asyncpg's per-connection statement cache, which
+        # keeps them prepared across pool checkouts; size it to hold the whole registry.
+        # A transaction pooler hands each transaction to any server connection, so
+        # named prepared statements can vanish: no cache there.
+        cache_size = 0 if settings.DB_POOLER_MODE else len(queries) + 100
+        return await asyncpg.create_pool(
+            dsn,
+            min_size=min(5, max_size),
+            max_size=max_size,
+            max_inactive_connection_lifetime=300,
+            statement_cache_size=cache_size,
+            init=self._init_connection
+        )
     
     async def connect(self):
         """Create database connection pool"""
@@ -20,59 +269,485 @@ class Database:
             return
         
         try:
-            self.pool = await asyncpg.create_pool(
-                settings.DATABASE_URL,
-                min_size=5,
-                max_size=settings.DB_POOL_SIZE,
-                max_inactive_connection_lifetime=300,
-            )
+            self.pool = await self._create_pool(settings.DATABASE_URL, settings.DB_POOL_SIZE)
+            self._pool_names[id(self.pool)] = "primary"
             logger.info("Database pool created successfully")
         except Exception as e:
             logger.error(f"Failed to create database pool: {e}")
             raise
+        
+        for name, size in settings.DB_WORKLOAD_POOLS.items():
+            pool = await self._create_pool(settings.DATABASE_URL, size)
+            self.workload_pools[name] = pool
+            self._pool_names[id(pool)] = name
+        if self.workload_pools:
+            logger.info(f"Workload pools created: {', '.join(self.workload_pools)}")
+        
+        for index, dsn in enumerate(settings.DATABASE_SHARD_URLS, start=1):
+            pool = await self._create_pool(dsn, settings.DB_POOL_SIZE)
+            self.shards[f"shard-{index}"] = pool
+            self._pool_names[id(pool)] = f"shard-{index}"
+        if self.shards:
+            self.shard_router = ShardRouter(["shard-0", *self.shards])
+            logger.info(f"{len(self.shards) + 1} shards configured")
+        
+        for index, dsn in enumerate(settings.DATABASE_REPLICA_URLS):
+            try:
+                pool = await self._create_pool(dsn, settings.DB_REPLICA_POOL_SIZE)
+                self.replicas.append(Replica(f"replica-{index}", pool))
+                self._pool_names[id(pool)] = f"replica-{index}"
+            except Exception as e:
+                logger.warning(f"Failed to create pool for replica-{index}, skipping it: {e}")
+        
+        if self.replicas:
+            await self._check_replica_lag()
+            self._lag_task = asyncio.create_task(self._replica_lag_loop())
+            logger.info(f"{len(self.replicas)} read replica pool(s) created")
+    
+    async def _check_replica_lag(self):
+        for replica in self.replicas:
+            try:
+                async with replica.pool.acquire(timeout=2) as conn:
+                    replica.lag = float(await conn.fetchval(REPLICA_LAG_QUERY, timeout=2))
+                replica.healthy = replica.lag <= settings.DB_REPLICA_MAX_LAG_SECONDS
+            except Exception as e:
+                logger.warning(f"Replica {replica.name} lag check failed: {e}")
+                replica.lag = None
+                replica.healthy = False
+    
+    async def _replica_lag_loop(self):
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_LAG_CHECK_SECONDS)
+            await self._check_replica_lag()
+    
+    async def _init_connection(self, conn: asyncpg.Connection):
+        """
+        Register type codecs on a fresh pooled connection.
+        JSON/JSONB values are encoded and decoded with orjson, and UUIDs arrive as strings.
+        """
+        await conn.set_type_codec(
+            "jsonb", schema="pg_catalog", format="binary",
+            encoder=_encode_jsonb, decoder=_decode_jsonb
+        )
+        await conn.set_type_codec(
+            "json", schema="pg_catalog", format="text",
+            encoder=_encode_json, decoder=orjson.loads
+        )
+        await conn.set_type_codec(
+            "uuid", schema="pg_catalog", format="binary",
+            encoder=_encode_uuid, decoder=_decode_uuid
+        )
     
     async def disconnect(self):
         """Close database connection pool"""
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        
+        for replica in self.replicas:
+            await replica.pool.close()
+        self.replicas = []
+        
+        for pool in self.workload_pools.values():
+            await pool.close()
+        self.workload_pools = {}
+        
+        for pool in self.shards.values():
+            await pool.close()
+        self.shards = {}
+        self.shard_router = ShardRouter(["shard-0"])
+        
         if self.pool:
             await self.pool.close()
             logger.info("Database pool closed")
     
-    @asynccontextmanager
-    async def get_connection(self):
-        """Get a database connection from the pool"""
+    async def acquire(self, pool: Optional[asyncpg.Pool] = None):
+        """Take a connection from a pool (the current workload's unless one is given), timing the wait"""
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
         
-        async with self.pool.acquire() as connection:
+        pool = pool or self.workload_pool()
+        name = self._pool_names.get(id(pool), "primary")
+        start = time.perf_counter()
+        try:
+            return await pool.acquire(timeout=deadline.budget(settings.DB_ACQUIRE_TIMEOUT_SECONDS))
+        except asyncio.TimeoutError:
+            DB_TIMEOUTS.inc("acquire")
+            if deadline.expired():
+                raise deadline.DeadlineExceeded()
+            raise
+        finally:
+            DB_ACQUIRE_SECONDS.observe(time.perf_counter() - start, name)
+    
+    @asynccontextmanager
+    async def get_connection(self, pool: Optional[asyncpg.Pool] = None):
+        """Get a database connection from a pool (the current workload's unless one is given)"""
+        pool = pool or self.workload_pool()
+        connection = await self.acquire(pool)
+        try:
             yield connection
+        finally:
+            await pool.release(connection)
+    
+    @property
+    def sharded(self) -> bool:
+        return bool(self.shards)
+    
+    def shard_pool(self, name: str) -> asyncpg.Pool:
+        """Main pool of a shard by name ("shard-0" is the primary)"""
+        return self.pool if name == "shard-0" else self.shards[name]
+    
+    def _routed_shard(self) -> Optional[asyncpg.Pool]:
+        """Pool of the pinned shard or the one owning the current @sharded key, None when that is the primary"""
+        name = _shard_name.get()
+        if name is not None:
+            return None if name == "shard-0" else self.shards[name]
+        
+        key = _shard_key.get()
+        if not self.shards or key is None or key == ALL_SHARDS:
+            return None
+        return self.shards.get(self.shard_router.shard_for(key))
+    
+    def workload_pool(self) -> asyncpg.Pool:
+        """
+        The primary pool for the current @use_pool workload (the main pool by default),
+        or the owning shard's pool for @sharded calls. Workload pools and replicas serve shard-0.
+        """
+        shard = self._routed_shard()
+        if shard is not None:
+            return shard
+        
+        name = _workload_pool.get()
+        if name is None:
+            return self.pool
+        return self.workload_pools.get(name, self.pool)
+    
+    def _pool_for(self, is_write: bool) -> asyncpg.Pool:
+        """Pick a healthy replica for annotated reads, otherwise the workload's primary pool"""
+        shard = self._routed_shard()
+        if shard is not None:
+            return shard
+        
+        if is_write or not self.replicas or not _replica_read.get():
+            return self.workload_pool()
+        
+        user_id = _request_user_id.get()
+        if user_id and self._wrote_recently(user_id):
+            return self.workload_pool()
+        
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return self.workload_pool()
+        
+        self._replica_cursor = (self._replica_cursor + 1) % len(healthy)
+        return healthy[self._replica_cursor].pool
+    
+    def _wrote_recently(self, user_id: str) -> bool:
+        written_at = self._recent_writes.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < settings.DB_READ_YOUR_WRITES_SECONDS
+    
+    def _record_write(self):
+        """Pin the request's user to the primary for a short window after a write"""
+        user_id = _request_user_id.get()
+        if not user_id or not self.replicas:
+            return
+        
+        now = time.monotonic()
+        self._recent_writes[user_id] = now
+        if len(self._recent_writes) > 10000:
+            cutoff = now - settings.DB_READ_YOUR_WRITES_SECONDS
+            self._recent_writes = {
+                uid: ts for uid, ts in self._recent_writes.items() if ts >= cutoff
+            }
+    
+    async def _run(self, method: str, query, args, conn=None):
+        """
+        Run a raw SQL string or a NamedQuery with the given connection method.
+        Uses conn when given (unit of work), otherwise a connection from the pool.
+        """
+        is_write = query.is_write if isinstance(query, NamedQuery) else is_write_statement(query)
+        if is_write:
+            self._record_write()
+        
+        if conn is None and self.shards and _shard_key.get() == ALL_SHARDS and _shard_name.get() is None:
+            return await self._scatter(method, query, args, is_write)
+        
+        if conn is None:
+            async with self.get_connection(self._pool_for(is_write)) as conn:
+                return await self._execute_on(conn, method, query, args)
+        return await self._execute_on(conn, method, query, args)
+    
+    async def fetch_by_shard(self, query, *args) -> Dict[str, List[dict]]:
+        """Run a read on every shard, keeping each shard's rows under its name"""
+        async def run(name):
+            with use_shard(name):
+                return await self.fetch_all(query, *args)
+        
+        names = self.shard_router.names
+        results = await asyncio.gather(*(run(name) for name in names))
+        return dict(zip(names, results))
+    
+    async def locate(self, query, *args) -> Tuple[Optional[str], Optional[dict]]:
+        """The first shard on which query returns a row, and that row ((None, None) if none does)"""
+        for name, rows in (await self.fetch_by_shard(query, *args)).items():
+            if rows:
+                return name, rows[0]
+        return None, None
+    
+    async def _scatter(self, method: str, query, args, is_write: bool):
+        """Run on every shard concurrently and combine the results"""
+        async def run(pool):
+            async with self.get_connection(pool) as conn:
+                return await self._execute_on(conn, method, query, args)
+        
+        pools = [self._pool_for(is_write), *self.shards.values()]
+        results = await asyncio.gather(*(run(pool) for pool in pools))
+        if method == "fetch":
+            return [row for rows in results for row in rows]
+        if method == "execute":
+            return results[0]
+        return next((result for result in results if result is not None), None)
+    
+    async def _execute_on(self, conn, method: str, query, args):
+        named = isinstance(query, NamedQuery)
+        label = query.name if named else "raw"
+        # The request's remaining budget bounds the query (None without a deadline)
+        timeout = deadline.remaining()
+        start = time.perf_counter()
+        failed = True
+        try:
+            sql = query.sql if named else query
+            result = await getattr(conn, method)(sql, *args, timeout=timeout)
+            failed = False
+            return result
+        except (asyncio.TimeoutError, asyncpg.QueryCanceledError):
+            DB_TIMEOUTS.inc("query")
+            if deadline.expired():
+                raise deadline.DeadlineExceeded()
+            raise
+        except Exception:
+            DB_ERRORS.inc(label)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_SECONDS.observe(elapsed, label)
+            if named:
+                query.record(elapsed, failed)
+            if not failed and elapsed >= slow_query_sampler.threshold:
+                self._sample_slow_query(label, query, args, elapsed)
+    
+    def _sample_slow_query(self, label: str, query, args, elapsed: float):
+        """Hand a slow query to the sampler with a side pool that keeps EXPLAIN off the OLTP pool"""
+        named = isinstance(query, NamedQuery)
+        sql = query.sql if named else query
+        is_write = query.is_write if named else is_write_statement(query)
+        pool = self._routed_shard() or self.workload_pools.get("batch") or self.pool
+        slow_query_sampler.observe(label, sql, args, elapsed, is_write, pool)
+    
+    async def execute(self, query, *args):
+        """Execute a query without returning results"""
+        return await self._run("execute", query, args)
+    
+    async def fetch_one(self, query, *args):
+        """Fetch a single row as dict"""
+        row = await self._run("fetchrow", query, args)
+        return dict(row) if row else None
+    
+    async def fetch_all(self, query, *args):
+        """Fetch all rows as list of dicts"""
+        rows = await self._run("fetch", query, args)
+        return [dict(row) for row in rows]
+    
+    async def fetch_records(self, query, *args):
+        """Fetch all rows as asyncpg Records, for RecordListResponse"""
+        return await self._run("fetch", query, args)
+    
+    async def fetch_val(self, query, *args):
+        """Fetch a single value"""
+        return await self._run("fetchval", query, args)
+    
+    def after_commit(self, callback: Callable[[], None]):
+        """Run callback once the current writes are durable; without a transaction that is now"""
+        callback()
+    
+    def stream(self, query, *args, prefetch: Optional[int] = None):
+        """
+        Yield Records through a server-side cursor, prefetch rows per round trip.
+        Holds one connection and a read-only repeatable-read transaction until the
+        consumer finishes or closes the generator, so the result is a single snapshot.
+        The pool is chosen here, since the generator usually runs after the route returns.
+        Under @all_shards the shards are streamed one after another, each its own snapshot.
+        """
+        pools = [self._pool_for(False)]
+        if self.shards and _shard_key.get() == ALL_SHARDS and _shard_name.get() is None:
+            pools.extend(self.shards.values())
+        return self._stream(pools, query, args, prefetch or settings.DB_EXPORT_PREFETCH)
+    
+    async def _stream(self, pools: List[asyncpg.Pool], query, args, prefetch: int):
+        sql = query.sql if isinstance(query, NamedQuery) else query
+        for pool in pools:
+            async with self.get_connection(pool) as conn:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    async for record in conn.cursor(sql, *args, prefetch=prefetch):
+                        yield record
+    
+    def pool_stats(self) -> dict:
+        """Pool occupancy, acquire-wait summary and failure counts for /health"""
+        acquire = DB_ACQUIRE_SECONDS.summary()
+        pools = {}
+        for name, pool in self._pools().items():
+            idle = pool.get_idle_size()
+            pools[name] = {
+                "max_size": pool.get_max_size(),
+                "size": pool.get_size(),
+                "in_use": pool.get_size() - idle,
+                "idle": idle,
+                "acquire": acquire.get(name),
+            }
+        return {
+            "pooler_mode": settings.DB_POOLER_MODE,
+            "pools": pools,
+            "acquire_timeouts": DB_TIMEOUTS.value("acquire"),
+            "query_timeouts": DB_TIMEOUTS.value("query"),
+            "query_errors": DB_ERRORS.total(),
+        }
+    
+    def replica_stats(self) -> Dict[str, dict]:
+        """Lag and health per replica"""
+        return {replica.name: replica.stats() for replica in self.replicas}
+    
+    @asynccontextmanager
+    async def unit_of_work(self, transactional: bool = False):
+        """
+        Run a group of queries on one connection, optionally in one transaction.
+        The transaction commits on success and rolls back if the block raises.
+        """
+        uow = UnitOfWork(self, transactional)
+        try:
+            yield uow
+        except BaseException:
+            await uow.close(commit=False)
+            raise
+        else:
+            await uow.close(commit=True)
+
+
+class UnitOfWork:
+    """
+    Request-scoped stand-in for Database that holds a single pooled connection.
+    The connection is acquired lazily on the first query, so work done before
+    touching the database (e.g. HTTP calls) does not hold it.
+    """
     
-    async def execute(self, query: str, *args):
+    def __init__(self, db: Database, transactional: bool = False):
+        self.db = db
+        self.transactional = transactional
+        self._connection = None
+        self._pool = None
+        self._transaction = None
+        self._after_commit: List[Callable[[], None]] = []
+    
+    @property
+    def sharded(self) -> bool:
+        return self.db.sharded
+    
+    def after_commit(self, callback: Callable[[], None]):
+        """Run callback after the transaction commits; dropped if it rolls back"""
+        if self.transactional:
+            self._after_commit.append(callback)
+        else:
+            callback()
+    
+    async def _acquire(self):
+        if self._connection is None:
+            if not self.db.pool:
+                raise RuntimeError("Database pool not initialized")
+            self._pool = self._shard_pool()
+            self._connection = await self.db.acquire(self._pool)
+            if self.transactional:
+                self._transaction = self._connection.transaction()
+                await self._transaction.start()
+        return self._connection
+    
+    def _shard_pool(self) -> asyncpg.Pool:
+        # A unit of work lives on one shard: a use_shard pin, the first query's @sharded key,
+        # else the request user's
+        key = _shard_key.get()
+        user_id = _request_user_id.get()
+        pinned = _shard_name.get() is not None
+        if self.db.sharded and not pinned and key in (None, ALL_SHARDS) and user_id:
+            with on_shard(user_id):
+                return self.db.workload_pool()
+        return self.db.workload_pool()
+    
+    async def close(self, commit: bool = True):
+        """Finish the transaction (if any), return the connection to the pool, then run after-commit callbacks"""
+        callbacks, self._after_commit = self._after_commit, []
+        if self._connection is not None:
+            try:
+                if self._transaction is not None:
+                    if commit:
+                        await self._transaction.commit()
+                    else:
+                        await self._transaction.rollback()
+            finally:
+                await self._pool.release(self._connection)
+                self._connection = None
+                self._transaction = None
+        
+        if commit:
+            for callback in callbacks:
+                callback()
+    
+    @asynccontextmanager
+    async def get_connection(self):
+        """The unit of work's connection (not released until close)"""
+        yield await self._acquire()
+    
+    async def execute(self, query, *args):
         """Execute a query without returning results"""
-        async with self.get_connection() as conn:
-            return await conn.execute(query, *args)
+        return await self.db._run("execute", query, args, await self._acquire())
     
-    async def fetch_one(self, query: str, *args):
+    async def fetch_one(self, query, *args):
         """Fetch a single row as dict"""
-        async with self.get_connection() as conn:
-            row = await conn.fetchrow(query, *args)
-            return dict(row) if row else None
+        row = await self.db._run("fetchrow", query, args, await self._acquire())
+        return dict(row) if row else None
     
-    async def fetch_all(self, query: str, *args):
+    async def fetch_all(self, query, *args):
         """Fetch all rows as list of dicts"""
-        async with self.get_connection() as conn:
-            rows = await conn.fetch(query, *args)
-            return [dict(row) for row in rows]
+        rows = await self.db._run("fetch", query, args, await self._acquire())
+        return [dict(row) for row in rows]
     
-    async def fetch_val(self, query: str, *args):
+    async def fetch_records(self, query, *args):
+        """Fetch all rows as asyncpg Records, for RecordListResponse"""
+        return await self.db._run("fetch", query, args, await self._acquire())
+    
+    async def fetch_val(self, query, *args):
         """Fetch a single value"""
-        async with self.get_connection() as conn:
-            return await conn.fetchval(query, *args)
+        return await self.db._run("fetchval", query, args, await self._acquire())
 
 
 # Global database instance
 db = Database()
 
+DB_POOL_CONNECTIONS = metrics.register(Gauge(
+    "db_pool_connections", "Pooled connections of the global database by state", ["pool", "state"],
+    db._connection_counts
+))
+
 
 async def get_db() -> Database:
     """Dependency for getting database instance"""
     return db
+
+
+async def get_unit_of_work():
+    """Dependency: one connection for the whole request, no transaction"""
+    async with db.unit_of_work() as uow:
+        yield uow
+
+
+async def get_transactional_unit_of_work():
+    """Dependency: one connection and one transaction for the whole request"""
+    async with db.unit_of_work(transactional=True) as uow:
+        yield uow
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from ..config.settings import settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Monotonic time by which the current request must finish (None = no deadline)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(HTTPException):
+    """The request ran out of its time budget"""
+
+    def __init__(self):
+        super().__init__(status_code=504, detail="Request deadline exceeded")
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget (None without a deadline); raises once spent"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded()
+    return left
+
+
+def budget(cap: Optional[float]) -> Optional[float]:
+    """A timeout for one call: cap, shortened to the remaining request budget"""
+    left = remaining()
+    if left is None:
+        return cap
+    return left if cap is None else min(cap, left)
+
+
+def expired() -> bool:
+    """Whether the current request has a deadline that has passed"""
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+class DeadlineMiddleware:
+    """
+    Give each request a time budget, carried in a contextvar for Database, httpx and
+    Firebase calls. A request still running at its deadline is cancelled with a 504.
+    """
+
+    # (method, path prefix below the API prefix, seconds or None for no deadline); first match wins
+    ROUTE_DEADLINES: List[Tuple[str, str, Optional[float]]] = [
+        ("POST", "/portfolio/analyze-github", 30.0),
+        ("POST", "/lifescore/calculate", 20.0),
+        ("POST", "/admin/import", 300.0),
+        # Streamed exports outlive any useful budget once the response has started
+        ("GET", "/admin/export", None),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    def deadline_for(self, method: str, path: str) -> Optional[float]:
+        for route_method, prefix, seconds in self.ROUTE_DEADLINES:
+            if method == route_method and path.startswith(f"{settings.API_V1_PREFIX}{prefix}"):
+                return seconds
+        return settings.REQUEST_DEADLINE_SECONDS or None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self.deadline_for(scope["method"], scope["path"])
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        token = _deadline.set(time.monotonic() + seconds)
+        timeout = asyncio.timeout(seconds)
+        try:
+            async with timeout:
+                await self.app(scope, receive, send_wrapper)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            logger.warning(f"{scope['method']} {scope['path']} exceeded its {seconds}s deadline")
+            if started:
+                raise
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({"detail": "Request deadline exceeded"}).encode(),
+            })
+        finally:
+            _deadline.reset(token)
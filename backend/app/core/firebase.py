@@ -1,19 +1,114 @@
 import json
+import asyncio
+import re
+import time
 import firebase_admin
+import httpx
+import jwt
+from concurrent.futures import ThreadPoolExecutor
+from cryptography import x509
 from firebase_admin import credentials, auth
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from ..config.settings import settings
 from ..core.logging import get_logger
+from ..core import deadline
 import os
 
 logger = get_logger(__name__)
 
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+
+class GooglePublicKeys:
+    """In-memory copy of Google's ID-token signing keys, refreshed in the background"""
+
+    def __init__(self):
+        self.keys: Dict[str, object] = {}
+        self.max_age: int = settings.FIREBASE_KEYS_MIN_REFRESH_SECONDS
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_now = asyncio.Event()
+        self._last_refresh: Optional[float] = None
+
+    async def refresh(self):
+        """Download the current certificates and swap them in"""
+        self._last_refresh = time.monotonic()
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(GOOGLE_CERTS_URL)
+            response.raise_for_status()
+
+        self.keys = {
+            kid: x509.load_pem_x509_certificate(cert.encode()).public_key()
+            for kid, cert in response.json().items()
+        }
+
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else 0
+        self.max_age = max(max_age, settings.FIREBASE_KEYS_MIN_REFRESH_SECONDS)
+        logger.info(f"Loaded {len(self.keys)} Firebase signing keys (refresh in {self.max_age}s)")
+
+    def request_refresh(self):
+        """
+        Ask the background task to refresh early (e.g. on an unknown kid), at most once
+        per FIREBASE_KEYS_MIN_REFRESH_SECONDS so bogus kids cannot trigger downloads
+        """
+        if (
+            self._last_refresh is not None
+            and time.monotonic() - self._last_refresh < settings.FIREBASE_KEYS_MIN_REFRESH_SECONDS
+        ):
+            return
+        self._refresh_now.set()
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_now.wait(), timeout=self.max_age)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_now.clear()
+
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Firebase key refresh failed, keeping previous keys: {e}")
+                await asyncio.sleep(settings.FIREBASE_KEYS_MIN_REFRESH_SECONDS)
+                self._refresh_now.set()
+
+    async def start(self):
+        """Load keys once and start the background refresh task"""
+        if self._task:
+            return
+
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Initial Firebase key download failed: {e}")
+
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Cancel the background refresh task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
 
 class FirebaseAuth:
     """Firebase authentication manager"""
 
+    # Maximum identifiers accepted by auth.get_users
+    GET_USERS_BATCH_SIZE = 100
+
     def __init__(self):
         self._initialized = False
+        self.public_keys = GooglePublicKeys()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.FIREBASE_EXECUTOR_WORKERS,
+            thread_name_prefix="firebase-admin",
+        )
 
     def initialize(self):
         """Initialize Firebase Admin SDK"""
@@ -54,15 +149,67 @@ class FirebaseAuth:
             logger.error(f"Failed to initialize Firebase: {e}")
             raise
 
+    async def _call(self, fn, *args):
+        """
+        Run a blocking Admin SDK call on the dedicated executor with a timeout
+        (FIREBASE_CALL_TIMEOUT_SECONDS, cut short by the request deadline).
+        A timed-out call keeps its worker thread until the SDK returns, which is
+        why the executor is size-capped.
+        """
+        if not self._initialized:
+            self.initialize()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, fn, *args),
+                timeout=deadline.budget(settings.FIREBASE_CALL_TIMEOUT_SECONDS),
+            )
+        except asyncio.TimeoutError:
+            if deadline.expired():
+                raise deadline.DeadlineExceeded()
+            raise
+
+    def _verify_locally(self, token: str) -> Optional[Dict]:
+        """
+        Verify an ID token against the in-memory signing keys.
+        Returns None only while no keys are loaded; an unknown kid is rejected.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = self.public_keys.keys.get(kid)
+        if public_key is None:
+            self.public_keys.request_refresh()
+            if not self.public_keys.keys:
+                return None
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+
+        project_id = settings.FIREBASE_PROJECT_ID
+        decoded_token = jwt.decode(
+            token,
+            public_key,
+            algorithms=["RS256"],
+            audience=project_id,
+            issuer=f"https://securetoken.google.com/{project_id}",
+            options={"require": ["exp", "iat", "sub"]},
+        )
+
+        if not decoded_token.get("sub"):
+            raise jwt.InvalidTokenError("Token has no subject")
+
+        decoded_token["uid"] = decoded_token["sub"]
+        return decoded_token
+
     async def verify_token(self, token: str) -> Optional[Dict]:
         """Verify Firebase ID token"""
         try:
-            # Ensure Firebase is initialized
-            if not self._initialized:
-                self.initialize()
+            decoded_token = self._verify_locally(token)
+            if decoded_token:
+                return decoded_token
 
-            decoded_token = auth.verify_id_token(token)
-            return decoded_token
+            # Keys not loaded yet: fall back to the Admin SDK off the event loop
+            return await self._call(auth.verify_id_token, token)
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             logger.warning(f"Token verification failed: {e}")
             return None
@@ -70,16 +217,44 @@ class FirebaseAuth:
     async def get_user(self, uid: str):
         """Get user by Firebase UID"""
         try:
-            user = auth.get_user(uid)
+            user = await self._call(auth.get_user, uid)
             return user
         except Exception as e:
             logger.error(f"Failed to get user {uid}: {e}")
             return None
 
+    async def get_users(self, uids: List[str]) -> Dict[str, auth.UserRecord]:
+        """
+        Get many users by Firebase UID, batching 100 UIDs per SDK call.
+        UIDs that do not exist are left out of the result.
+        """
+        unique_uids = list(dict.fromkeys(uids))
+        batches = [
+            unique_uids[i:i + self.GET_USERS_BATCH_SIZE]
+            for i in range(0, len(unique_uids), self.GET_USERS_BATCH_SIZE)
+        ]
+
+        results = await asyncio.gather(
+            *[
+                self._call(auth.get_users, [auth.UidIdentifier(uid) for uid in batch])
+                for batch in batches
+            ],
+            return_exceptions=True,
+        )
+
+        users = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to get {len(batch)} users: {result}")
+                continue
+            for user in result.users:
+                users[user.uid] = user
+        return users
+
     async def create_custom_token(self, uid: str, claims: Optional[Dict] = None) -> str:
         """Create a custom token for a user"""
         try:
-            token = auth.create_custom_token(uid, claims)
+            token = await self._call(auth.create_custom_token, uid, claims)
             return token.decode('utf-8')
         except Exception as e:
             logger.error(f"Failed to create custom token: {e}")
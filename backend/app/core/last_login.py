@@ -0,0 +1,90 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from ..config.settings import settings
+from ..core.database import Database, db, use_pool, all_shards
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LastLoginTracker:
+    """
+    Write-behind tracker for users.last_login.
+    Records at most one timestamp per user per interval and flushes them in one batched UPDATE.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._pending: Dict[str, datetime] = {}
+        self._last_recorded: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str):
+        """Note a login for user_id; cheap and safe to call on every request"""
+        now = time.time()
+        last = self._last_recorded.get(user_id)
+        if last is not None and now - last < settings.LAST_LOGIN_INTERVAL_SECONDS:
+            return
+
+        self._last_recorded[user_id] = now
+        self._pending[user_id] = datetime.now(timezone.utc)
+
+    def mark_recorded(self, user_id: str):
+        """Note that last_login was just written inline, restarting the user's interval"""
+        self._last_recorded[user_id] = time.time()
+        self._pending.pop(user_id, None)
+
+    @use_pool("batch")
+    @all_shards
+    async def flush(self):
+        """Write all pending timestamps in a single statement"""
+        if not self._pending or not self.db.pool:
+            return
+
+        pending, self._pending = self._pending, {}
+        query = """
+            UPDATE users AS u
+            SET last_login = v.last_login
+            FROM unnest($1::uuid[], $2::timestamptz[]) AS v(id, last_login)
+            WHERE u.id = v.id
+        """
+        try:
+            await self.db.execute(query, list(pending.keys()), list(pending.values()))
+        except Exception as e:
+            logger.error(f"Failed to flush last_login for {len(pending)} users: {e}")
+            for user_id, ts in pending.items():
+                self._pending.setdefault(user_id, ts)
+            return
+
+        # Forget users whose interval has passed so the map stays bounded
+        cutoff = time.time() - settings.LAST_LOGIN_INTERVAL_SECONDS
+        self._last_recorded = {
+            user_id: ts for user_id, ts in self._last_recorded.items() if ts >= cutoff
+        }
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(settings.LAST_LOGIN_FLUSH_SECONDS)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic flush task"""
+        if not self._task:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the periodic flush task and write anything still pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global tracker instance
+last_login_tracker = LastLoginTracker(db)
@@ -0,0 +1,155 @@
+import bisect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def total(self) -> float:
+        """Sum across all label sets"""
+        return sum(self._values.values())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for values, total in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {total}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose samples are read from a callback at scrape time"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Iterable[str],
+        collect: Callable[[], Dict[LabelValues, float]],
+    ):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge"]
+        for values, value in self.collect().items():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    DEFAULT_BUCKETS = (
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """Upper bucket bound containing the q-quantile (None without samples)"""
+        series = self._series.get(label_values)
+        if not series or not series[2]:
+            return None
+
+        target = q * series[2]
+        running = 0
+        for bound, count in zip(self.buckets, series[0]):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def summary(self) -> Dict[str, dict]:
+        """Count, mean and approximate p50/p99 per label set, in milliseconds"""
+        result = {}
+        for values, (_, total, count) in self._series.items():
+            p50 = self.quantile(0.5, *values)
+            p99 = self.quantile(0.99, *values)
+            result[",".join(values) or "all"] = {
+                "count": count,
+                "avg_ms": round(total * 1000 / count, 3) if count else 0.0,
+                "p50_ms": round(p50 * 1000, 3) if p50 not in (None, float("inf")) else p50,
+                "p99_ms": round(p99 * 1000, 3) if p99 not in (None, float("inf")) else p99,
+            }
+        return result
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in self._series.items():
+            running = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                running += bucket_count
+                labels = _format_labels(self.labels, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = _format_labels(self.labels, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """Add a metric; each name may be registered once"""
+        if any(existing.name == metric.name for existing in self._metrics):
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry, served at /metrics
+metrics = MetricsRegistry()
@@ -0,0 +1,85 @@
+import re
+from typing import Dict, Iterator
+
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|TRUNCATE|MERGE)\b", re.IGNORECASE)
+
+
+def is_write_statement(sql: str) -> bool:
+    """Whether a statement modifies data (and therefore must run on the primary)"""
+    return bool(_WRITE_KEYWORDS.search(sql))
+
+
+class NamedQuery:
+    """A registered SQL statement plus its execution statistics"""
+
+    __slots__ = ("name", "sql", "is_write", "calls", "errors", "total_time", "max_time")
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.is_write = is_write_statement(sql)
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, failed: bool = False):
+        """Record one execution (elapsed in seconds)"""
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if failed:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_time * 1000, 3),
+            "avg_ms": round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_time * 1000, 3),
+        }
+
+    def __repr__(self) -> str:
+        return f"NamedQuery({self.name!r})"
+
+
+class QueryRegistry:
+    """
+    Central registry of named SQL statements.
+    Database executes NamedQuery objects through asyncpg's statement cache, sized to
+    hold every registered query, so each stays prepared on every pooled connection.
+    """
+
+    def __init__(self):
+        self._queries: Dict[str, NamedQuery] = {}
+
+    def register(self, name: str, sql: str) -> NamedQuery:
+        """Register a statement under a unique name and return its handle"""
+        existing = self._queries.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Query {name!r} is already registered with different SQL")
+            return existing
+
+        query = NamedQuery(name, sql)
+        self._queries[name] = query
+        return query
+
+    def __getitem__(self, name: str) -> NamedQuery:
+        return self._queries[name]
+
+    def __iter__(self) -> Iterator[NamedQuery]:
+        return iter(list(self._queries.values()))
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-query execution counts and timings"""
+        return {name: query.stats() for name, query in self._queries.items()}
+
+
+# Global query registry
+queries = QueryRegistry()
@@ -0,0 +1,216 @@
+import asyncio
+import time
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from ..config.settings import settings
+from ..core.database import Database, db, use_shard
+from ..core.logging import get_logger
+from ..repositories.lifescore_repository import LifeScoreRepository
+
+logger = get_logger(__name__)
+
+Score = Union[float, Decimal]
+
+# composite_score is DECIMAL(5,2) in [0, 100]: one bucket per 0.01
+SCORE_BUCKETS = 10001
+
+
+def score_bucket(score: Score) -> int:
+    return min(max(int(round(float(score) * 100)), 0), SCORE_BUCKETS - 1)
+
+
+class FenwickTree:
+    """Binary indexed tree of counts: O(log n) point updates and prefix sums"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    @classmethod
+    def from_counts(cls, counts: List[int]) -> "FenwickTree":
+        """Build in O(n) from per-bucket counts"""
+        tree = cls(len(counts))
+        tree._tree[1:] = counts
+        for i in range(1, tree.size + 1):
+            parent = i + (i & -i)
+            if parent <= tree.size:
+                tree._tree[parent] += tree._tree[i]
+        return tree
+
+    def add(self, index: int, delta: int):
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of buckets 0..index inclusive (0 for index < 0)"""
+        total = 0
+        i = min(index, self.size - 1) + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class RankIndex:
+    """
+    In-memory order statistics over each user's latest composite_score, the source of
+    rank and percentile in responses. Loaded from every shard at startup and reloaded
+    periodically, which also picks up scores written by other workers.
+
+    Each load also writes changed positions back to the stored rank and percentile
+    columns, keeping them at most one refresh interval stale.
+
+    rank is 1 + the number of users with a higher score (ties share a rank);
+    percentile matches PERCENT_RANK: the share of other users with a lower score.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._tree = FenwickTree(SCORE_BUCKETS)
+        self._buckets: Dict[str, int] = {}
+        self._updates_during_load: Optional[Dict[str, int]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def load(self):
+        """Rebuild from the latest score of every user, keeping updates made meanwhile"""
+        self._updates_during_load = {}
+        try:
+            by_shard = await LifeScoreRepository(self.db).get_latest_scores_by_shard()
+            buckets = {
+                str(row['user_id']): score_bucket(row['composite_score'])
+                for rows in by_shard.values() for row in rows
+            }
+            buckets.update(self._updates_during_load)
+        finally:
+            self._updates_during_load = None
+
+        counts = [0] * SCORE_BUCKETS
+        for bucket in buckets.values():
+            counts[bucket] += 1
+        self._tree = FenwickTree.from_counts(counts)
+        self._buckets = buckets
+        self.loaded_at = time.time()
+        logger.info(f"Rank index loaded with {len(buckets)} users")
+        await self._persist(by_shard)
+
+    async def _persist(self, by_shard: Dict[str, List[dict]]):
+        """
+        Write positions back to the latest score rows whose stored rank or percentile
+        changed, so the columns stay current for readers that bypass the index.
+        """
+        repo = LifeScoreRepository(self.db)
+        for shard, rows in by_shard.items():
+            ids, ranks, percentiles = [], [], []
+            for row in rows:
+                rank, percentile = self.position(row['composite_score'])
+                stored = float(row['percentile']) if row['percentile'] is not None else None
+                if row['rank'] != rank or stored != percentile:
+                    ids.append(row['id'])
+                    ranks.append(rank)
+                    percentiles.append(percentile)
+            if not ids:
+                continue
+            try:
+                with use_shard(shard):
+                    await repo.set_positions(ids, ranks, percentiles)
+            except Exception as e:
+                logger.error(f"Storing {len(ids)} ranks on {shard} failed: {e}")
+
+    def update(self, user_id: str, score: Score):
+        """Record a user's new latest score"""
+        bucket = score_bucket(score)
+        if self._updates_during_load is not None:
+            self._updates_during_load[user_id] = bucket
+        self._move(user_id, bucket)
+
+    def _move(self, user_id: str, bucket: Optional[int]):
+        previous = self._buckets.get(user_id)
+        if previous == bucket:
+            return
+        if previous is not None:
+            self._tree.add(previous, -1)
+            del self._buckets[user_id]
+        if bucket is not None:
+            self._tree.add(bucket, 1)
+            self._buckets[user_id] = bucket
+
+    def position_if(self, user_id: str, score: Score) -> Tuple[Optional[int], Optional[float]]:
+        """(rank, percentile) the user would have with this latest score, leaving the index unchanged"""
+        previous = self._buckets.get(user_id)
+        self._move(user_id, score_bucket(score))
+        try:
+            return self.position(score)
+        finally:
+            self._move(user_id, previous)
+
+    def position(self, score: Optional[Score]) -> Tuple[Optional[int], Optional[float]]:
+        """(rank, percentile) of a score among the indexed users; (None, None) before loading"""
+        if score is None or not self.loaded or not self._buckets:
+            return None, None
+
+        bucket = score_bucket(score)
+        total = len(self._buckets)
+        lower = self._tree.prefix_sum(bucket - 1)
+        higher = total - self._tree.prefix_sum(bucket)
+        percentile = lower / (total - 1) * 100 if total > 1 else 0.0
+        return higher + 1, round(percentile, 2)
+
+    def annotate(self, row: Optional[dict], score_key: str = 'composite_score') -> Optional[dict]:
+        """Overwrite a row's stored rank and percentile with the index's, once loaded"""
+        if row is None or not self.loaded:
+            return row
+        row['rank'], row['percentile'] = self.position(row.get(score_key))
+        return row
+
+    async def annotate_stream(self, records: AsyncIterator, score_key: str = 'composite_score'):
+        """annotate() each streamed Record, as a dict"""
+        async for record in records:
+            yield self.annotate(dict(record), score_key)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.RANK_INDEX_REFRESH_SECONDS)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Rank index refresh failed: {e}")
+
+    async def start(self):
+        """Load the index and start the periodic refresh"""
+        if self._task:
+            return
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"Rank index load failed (stored ranks used until refresh): {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "users": len(self._buckets),
+            "age_seconds": round(time.time() - self.loaded_at, 1) if self.loaded else None,
+        }
+
+
+# Global rank index
+rank_index = RankIndex(db)
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Tuple
+from ..config.settings import settings
+from ..core.logging import get_logger
+from ..core.security import token_cache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional; buckets stay in memory without it
+    aioredis = None
+
+logger = get_logger(__name__)
+
+# (allowed, tokens left after this request)
+BucketResult = Tuple[bool, float]
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process; beyond max_keys the least recently used are forgotten"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, cost: float, capacity: float, rate: float) -> BucketResult:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, tokens
+
+
+class RedisBucketStore:
+    """Token buckets shared between workers through Redis"""
+
+    SCRIPT = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+        local t = redis.call('TIME')
+        local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+        local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(data[1]) or capacity
+        local ts = tonumber(data[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+        local allowed = 0
+        if tokens >= cost then
+            tokens = tokens - cost
+            allowed = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+        return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str):
+        self._redis = aioredis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    async def consume(self, key: str, cost: float, capacity: float, rate: float) -> BucketResult:
+        allowed, tokens = await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost])
+        return bool(allowed), float(tokens)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing RATE_LIMIT_PER_MINUTE with token buckets.
+    Requests with an already-verified token draw from a per-user bucket; anonymous ones and
+    tokens not yet verified draw from a per-IP bucket, and expensive routes cost more than one token.
+    """
+
+    EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+    def __init__(self, app):
+        self.app = app
+        self.capacity = float(settings.RATE_LIMIT_PER_MINUTE)
+        self.rate = self.capacity / 60.0
+        self.route_costs = {}
+        for route, cost in settings.RATE_LIMIT_ROUTE_COSTS.items():
+            method, path = route.split(" ", 1)
+            self.route_costs[f"{method.upper()} {settings.API_V1_PREFIX}{path}"] = cost
+        self.store = self._build_store()
+        self.fallback_store = MemoryBucketStore()
+
+    def _build_store(self):
+        if settings.REDIS_URL:
+            if aioredis is None:
+                logger.warning("REDIS_URL is set but redis is not installed; rate limits are per process")
+            else:
+                return RedisBucketStore(settings.REDIS_URL)
+        return MemoryBucketStore()
+
+    def _bucket_key(self, scope) -> str:
+        """
+        Per-user key for a bearer token that verified earlier (it is in the token cache),
+        otherwise per-IP: unverified tokens must not get fresh buckets, or rotating a
+        made-up Authorization header would bypass the IP limit.
+        """
+        headers = dict(scope.get("headers") or [])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            token_key = hashlib.sha256(authorization[7:].strip().encode()).hexdigest()
+            claims = token_cache.peek(token_key)
+            if claims and claims.get("uid"):
+                return f"user:{claims['uid']}"
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cost = min(self.route_costs.get(f"{scope['method']} {scope['path']}", 1), self.capacity)
+        key = self._bucket_key(scope)
+
+        try:
+            allowed, tokens = await self.store.consume(key, cost, self.capacity, self.rate)
+        except Exception as e:
+            logger.warning(f"Rate limit store failed, using in-process buckets: {e}")
+            allowed, tokens = await self.fallback_store.consume(key, cost, self.capacity, self.rate)
+
+        limit_headers = [
+            (b"ratelimit-limit", str(int(self.capacity)).encode()),
+            (b"ratelimit-remaining", str(int(tokens)).encode()),
+            (b"ratelimit-reset", str(math.ceil((self.capacity - tokens) / self.rate)).encode()),
+        ]
+
+        if not allowed:
+            retry_after = math.ceil((cost - tokens) / self.rate)
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": limit_headers + [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"content-type", b"application/json"),
+                ],
+            })
+            await send({
+                "type": "http.response.body",
+                "body": json.dumps({"detail": "Rate limit exceeded"}).encode(),
+            })
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,14 +1,49 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+import hashlib
+from ..config.settings import settings
+from ..core.cache import LRUCache, user_cache
 from ..core.firebase import firebase_auth
-from ..core.database import get_db, Database
+from ..core.database import get_db, set_request_user, on_shard, use_shard, user_id_for_uid, Database
+from ..core.queries import queries
+from ..core.last_login import last_login_tracker
+from ..core.activity_log import activity_log_sink
+from ..repositories.user_repository import UserRepository
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
 security = HTTPBearer()
 
+# The conflict update changes nothing, so RETURNING yields an existing row too;
+# last_login of existing users is written by last_login_tracker
+UPSERT_LOGIN_USER = queries.register("auth.upsert_login_user", """
+    INSERT INTO users (id, firebase_uid, email, last_login)
+    VALUES ($3, $1, $2, NOW())
+    ON CONFLICT (firebase_uid) DO UPDATE SET firebase_uid = EXCLUDED.firebase_uid
+    RETURNING id, firebase_uid, email, role, is_active, is_banned,
+              (xmax = 0) AS created
+""")
+
+# Decoded Firebase claims keyed by token digest; entries expire at the token's exp
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+
+async def verify_token_cached(token: str) -> Optional[dict]:
+    """Verify a Firebase ID token, reusing claims for tokens already seen"""
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    
+    decoded_token = token_cache.get(token_key)
+    if decoded_token is not None:
+        return decoded_token
+    
+    decoded_token = await firebase_auth.verify_token(token)
+    if decoded_token and decoded_token.get("exp"):
+        token_cache.set(token_key, decoded_token, expires_at=float(decoded_token["exp"]))
+    
+    return decoded_token
+
 
 class AuthUser:
     """Authenticated user object"""
@@ -26,6 +61,27 @@ class AuthUser:
         return self.role in ["admin", "moderator"]
 
 
+async def _upsert_login_user(db: Database, firebase_uid: str, email: str) -> dict:
+    """
+    Return the user, creating it on first login, with `created` set for new users.
+    With shards, the user is looked up on its hash shard first; only users not found
+    there are looked up on every shard: new users, and users created before sharding
+    that app.rebalance_shards has not moved yet. Existing users are not written to.
+    """
+    user_id = user_id_for_uid(firebase_uid)
+    if db.sharded:
+        repo = UserRepository(db)
+        with use_shard(db.shard_router.shard_for(user_id)):
+            user = await repo.get_by_firebase_uid(firebase_uid)
+        if user is None:
+            _, user = await repo.locate_by_firebase_uid(firebase_uid)
+        if user is not None:
+            return {**user, 'created': False}
+    
+    with on_shard(user_id):
+        return await db.fetch_one(UPSERT_LOGIN_USER, firebase_uid, email, user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Database = Depends(get_db)
@@ -37,7 +93,7 @@ async def get_current_user(
     token = credentials.credentials
     
     # Verify Firebase token
-    decoded_token = await firebase_auth.verify_token(token)
+    decoded_token = await verify_token_cached(token)
     if not decoded_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,23 +109,17 @@ async def get_current_user(
             detail="Invalid token payload"
         )
     
-    # Get or create user in database
-    query = """
-        SELECT id, firebase_uid, email, role, is_active, is_banned
-        FROM users
-        WHERE firebase_uid = $1
-    """
-    user_record = await db.fetch_one(query, firebase_uid)
+    # Get or create user in database (role/ban state is cached per firebase_uid)
+    user_record = user_cache.get(firebase_uid)
     
     if not user_record:
-        # Auto-create user on first login
-        insert_query = """
-            INSERT INTO users (firebase_uid, email)
-            VALUES ($1, $2)
-            RETURNING id, firebase_uid, email, role
-        """
-        user_record = await db.fetch_one(insert_query, firebase_uid, email)
-        logger.info(f"Created new user: {email}")
+        # Auto-create on first login; a new user's last_login is written by the insert
+        user_record = await _upsert_login_user(db, firebase_uid, email)
+        if user_record.pop('created'):
+            logger.info(f"Created new user: {email}")
+            last_login_tracker.mark_recorded(user_record['id'])
+        
+        user_cache.set(firebase_uid, user_record)
     
     # Check if user is active (Database layer returns dicts now)
     if not user_record.get('is_active', True) or user_record.get('is_banned', False):
@@ -78,14 +128,12 @@ async def get_current_user(
             detail="User account is inactive or banned"
         )
     
-    # Update last login
-    await db.execute(
-        "UPDATE users SET last_login = NOW() WHERE id = $1",
-        user_record['id']
-    )
+    # Update last login (coalesced and written in batches)
+    last_login_tracker.touch(user_record['id'])
+    set_request_user(user_record['id'])
     
     return AuthUser(
-        user_id=str(user_record['id']),
+        user_id=user_record['id'],
         firebase_uid=user_record['firebase_uid'],
         email=user_record['email'],
         role=user_record['role']
@@ -121,7 +169,7 @@ async def log_activity(
     metadata: Optional[dict] = None,
     request: Optional[Request] = None
 ):
-    """Log user activity"""
+    """Log user activity (queued and written in batches by the activity log sink)"""
     try:
         ip_address = None
         user_agent = None
@@ -130,14 +178,7 @@ async def log_activity(
             ip_address = request.client.host if request.client else None
             user_agent = request.headers.get("user-agent")
         
-        query = """
-            INSERT INTO activity_logs 
-            (user_id, action, resource_type, resource_id, metadata, ip_address, user_agent)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-        """
-        
-        await db.execute(
-            query,
+        activity_log_sink.submit(
             user_id,
             action,
             resource_type,
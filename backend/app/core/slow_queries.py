@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Set
+import asyncpg
+from ..config.settings import settings
+from ..core.logging import get_logger
+from ..core.metrics import metrics, Counter
+
+logger = get_logger(__name__)
+
+DB_SLOW_QUERIES = metrics.register(Counter(
+    "db_slow_queries_total", "Queries slower than SLOW_QUERY_THRESHOLD_MS", ["query"]
+))
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and replace inline literals with ? so repeats group together"""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class SlowQuerySampler:
+    """
+    Records queries slower than the threshold and, for a sample of them, captures
+    EXPLAIN (ANALYZE, BUFFERS) from a side connection. The EXPLAIN runs in a background
+    task inside a transaction that is always rolled back. Plans go into a bounded ring buffer.
+    """
+
+    def __init__(self):
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+        self.slow_total = 0
+        self.explained = 0
+        self.explain_failures = 0
+        self._last_explained: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def threshold(self) -> float:
+        return settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def observe(self, label: str, sql: str, args: tuple, elapsed: float,
+                is_write: bool, pool: Optional[asyncpg.Pool]):
+        """Called after every successful query; cheap unless the query was slow"""
+        if settings.SLOW_QUERY_THRESHOLD_MS <= 0 or elapsed < self.threshold:
+            return
+
+        self.slow_total += 1
+        DB_SLOW_QUERIES.inc(label)
+
+        if pool is None or (is_write and not settings.SLOW_QUERY_EXPLAIN_WRITES):
+            return
+        if len(self._tasks) >= settings.SLOW_QUERY_MAX_CONCURRENT_EXPLAINS:
+            return
+        if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+            return
+
+        normalized = normalize_sql(sql)
+        now = time.monotonic()
+        last = self._last_explained.get(normalized)
+        if last is not None and now - last < settings.SLOW_QUERY_COOLDOWN_SECONDS:
+            return
+        self._last_explained[normalized] = now
+        if len(self._last_explained) > 4 * settings.SLOW_QUERY_BUFFER_SIZE:
+            self._last_explained.clear()
+
+        # Fresh context: the request's deadline and routing must not leak into the side query
+        task = asyncio.create_task(
+            self._explain(label, sql, normalized, args, elapsed, pool),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, label: str, sql: str, normalized: str, args: tuple,
+                       elapsed: float, pool: asyncpg.Pool):
+        timeout = settings.SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS
+        try:
+            async with pool.acquire(timeout=timeout) as conn:
+                transaction = conn.transaction()
+                await transaction.start()
+                try:
+                    plan = await conn.fetchval(
+                        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", *args, timeout=timeout
+                    )
+                finally:
+                    # ANALYZE executes the statement; never keep its effects
+                    await transaction.rollback()
+        except Exception as e:
+            self.explain_failures += 1
+            logger.warning(f"EXPLAIN for slow query {label} failed: {e}")
+            return
+
+        plan = plan[0] if isinstance(plan, list) else plan
+        self.explained += 1
+        self.entries.append({
+            "query": label,
+            "sql": normalized,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "planning_ms": plan.get("Planning Time"),
+            "execution_ms": plan.get("Execution Time"),
+            "plan": plan.get("Plan"),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        """Sampler settings, counters and captured plans, newest first"""
+        return {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "sample_rate": settings.SLOW_QUERY_SAMPLE_RATE,
+            "slow_total": self.slow_total,
+            "explained": self.explained,
+            "explain_failures": self.explain_failures,
+            "entries": list(reversed(self.entries)),
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self._last_explained.clear()
+
+
+# Global slow-query sampler fed by Database
+slow_query_sampler = SlowQuerySampler()
@@ -1,12 +1,21 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import time
 
 from .config.settings import settings
 from .core.database import db
+from .core.metrics import metrics
 from .core.firebase import firebase_auth
+from .core.last_login import last_login_tracker
+from .core.activity_log import activity_log_sink, activity_log_retention
+from .core.rank_index import rank_index
+from .core.cache import user_cache
+from .core.security import token_cache
+from .core.rate_limit import RateLimitMiddleware
+from .core.admission import AdmissionControlMiddleware, admission_controller
+from .core.deadline import DeadlineMiddleware
 from .core.logging import get_logger
 from .routes import auth, cognitive, portfolio, lifescore, certificate, endorsement, admin, profile
 
@@ -28,11 +37,23 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Firebase initialization failed (continuing anyway): {e}")
     
+    await firebase_auth.public_keys.start()
+    last_login_tracker.start()
+    activity_log_sink.start()
+    if db.pool:
+        activity_log_retention.start()
+        await rank_index.start()
+    
     logger.info("LifeScore API started successfully")
     
     yield
     
     logger.info("Shutting down LifeScore API...")
+    await firebase_auth.public_keys.stop()
+    await last_login_tracker.stop()
+    await activity_log_retention.stop()
+    await rank_index.stop()
+    await activity_log_sink.stop()
     await db.disconnect()
     logger.info("LifeScore API shutdown complete")
 
@@ -45,6 +66,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(DeadlineMiddleware)
+
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],      # TEMP for development
@@ -102,10 +129,23 @@ async def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "pool": db.pool_stats(),
+        "replicas": db.replica_stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "activity_log": activity_log_sink.stats(),
+        "admission": admission_controller.stats(),
+        "rank_index": rank_index.stats(),
         "environment": settings.ENVIRONMENT
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(cognitive.router, prefix=settings.API_V1_PREFIX)
 app.include_router(portfolio.router, prefix=settings.API_V1_PREFIX)
@@ -0,0 +1,98 @@
+"""
+Move users to the shard the consistent-hash ring assigns them (DATABASE_URL plus DATABASE_SHARD_URLS).
+Run after adding a shard, or after a bulk import into shard-0, during a write-quiet window:
+
+    python -m app.rebalance_shards --dry-run
+    python -m app.rebalance_shards
+
+A user's rows are copied to the target shard in one transaction, then deleted from the
+source (the users row cascades). Re-running is safe: the source stays authoritative until
+its delete, and any partial copy on the target is replaced.
+"""
+import argparse
+import asyncio
+from collections import Counter
+
+from .core.database import db
+from .core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Tables holding a user's rows, in foreign-key order, with the column naming the user
+USER_TABLES = [
+    ("users", "id"),
+    ("profiles", "user_id"),
+    ("auth_providers", "user_id"),
+    ("sessions", "user_id"),
+    ("cognitive_tests", "user_id"),
+    ("cognitive_scores", "user_id"),
+    ("github_repos", "user_id"),
+    ("github_metrics", "user_id"),
+    ("portfolio_scores", "user_id"),
+    ("endorsements", "user_id"),
+    ("lifescore_history", "user_id"),
+    ("certificates", "user_id"),
+]
+
+
+async def move_user(user_id: str, source: str, target: str):
+    """Copy one user's rows from source to target, then delete them from source"""
+    async with db.get_connection(db.shard_pool(source)) as src, \
+            db.get_connection(db.shard_pool(target)) as dst:
+        async with src.transaction(isolation="repeatable_read", readonly=True):
+            tables = [
+                (table, await src.fetch(f"SELECT * FROM {table} WHERE {column} = $1", user_id))
+                for table, column in USER_TABLES
+            ]
+
+        async with dst.transaction():
+            await dst.execute("DELETE FROM users WHERE id = $1", user_id)
+            for table, rows in tables:
+                if rows:
+                    await dst.copy_records_to_table(
+                        table, records=[tuple(row) for row in rows], columns=list(rows[0].keys())
+                    )
+
+        await src.execute("DELETE FROM users WHERE id = $1", user_id)
+
+
+async def rebalance(dry_run: bool = False) -> Counter:
+    """Move every misplaced user; returns counts keyed by (source, target)"""
+    moves = Counter()
+    for source in db.shard_router.names:
+        async with db.get_connection(db.shard_pool(source)) as conn:
+            user_ids = [row["id"] for row in await conn.fetch("SELECT id FROM users")]
+
+        for user_id in user_ids:
+            target = db.shard_router.shard_for(user_id)
+            if target == source:
+                continue
+            moves[(source, target)] += 1
+            if not dry_run:
+                await move_user(user_id, source, target)
+                logger.info(f"Moved user {user_id} from {source} to {target}")
+
+    return moves
+
+
+async def main(args: argparse.Namespace):
+    await db.connect()
+    try:
+        if not db.sharded:
+            print("No DATABASE_SHARD_URLS configured; nothing to rebalance")
+            return
+        moves = await rebalance(args.dry_run)
+    finally:
+        await db.disconnect()
+
+    verb = "Would move" if args.dry_run else "Moved"
+    for (source, target), count in sorted(moves.items()):
+        print(f"{verb} {count} user(s) from {source} to {target}")
+    if not moves:
+        print("All users are on their shard")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move users to their consistent-hash shard")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the moves")
+    asyncio.run(main(parser.parse_args()))
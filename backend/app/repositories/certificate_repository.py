@@ -1,13 +1,56 @@
 from typing import Dict, Any, Optional
-from ..core.database import Database
+from ..core.database import Database, replica_read, sharded, all_shards
+from ..core.queries import queries
 from ..core.logging import get_logger
-import json
 import hashlib
 from datetime import datetime, timedelta
 
 logger = get_logger(__name__)
 
 
+CREATE_CERTIFICATE = queries.register("certificates.create_certificate", """
+    INSERT INTO certificates
+    (user_id, lifescore_id, certificate_hash, score, issued_at, expires_at, metadata)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    RETURNING id, user_id, lifescore_id, certificate_hash, score, issued_at,
+              expires_at, status, metadata, blockchain_tx_hash, created_at
+""")
+
+GET_BY_ID = queries.register("certificates.get_by_id", """
+    SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
+           expires_at, status, metadata, blockchain_tx_hash, created_at
+    FROM certificates
+    WHERE id = $1
+""")
+
+GET_BY_HASH = queries.register("certificates.get_by_hash", """
+    SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
+           expires_at, status, metadata, blockchain_tx_hash, created_at
+    FROM certificates
+    WHERE certificate_hash = $1
+""")
+
+GET_USER_CERTIFICATES = queries.register("certificates.get_user_certificates", """
+    SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
+           expires_at, status, metadata, blockchain_tx_hash, created_at
+    FROM certificates
+    WHERE user_id = $1
+    ORDER BY issued_at DESC
+""")
+
+REVOKE_CERTIFICATE = queries.register("certificates.revoke_certificate", """
+    UPDATE certificates
+    SET status = 'revoked'
+    WHERE id = $1
+""")
+
+UPDATE_BLOCKCHAIN_HASH = queries.register("certificates.update_blockchain_hash", """
+    UPDATE certificates
+    SET blockchain_tx_hash = $2
+    WHERE id = $1
+""")
+
+
 class CertificateRepository:
     """Repository for certificate operations"""
     
@@ -19,6 +62,7 @@ class CertificateRepository:
         data = f"{user_id}:{score}:{issued_at.isoformat()}"
         return hashlib.sha256(data.encode()).hexdigest()
     
+    @sharded("user_id")
     async def create_certificate(
         self,
         user_id: str,
@@ -31,70 +75,41 @@ class CertificateRepository:
         issued_at = datetime.utcnow()
         certificate_hash = self.generate_certificate_hash(user_id, score, issued_at)
         expires_at = issued_at + timedelta(days=expires_in_days) if expires_in_days else None
-        
-        query = """
-            INSERT INTO certificates
-            (user_id, lifescore_id, certificate_hash, score, issued_at, expires_at, metadata)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id, user_id, lifescore_id, certificate_hash, score, issued_at,
-                      expires_at, status, metadata, blockchain_tx_hash, created_at
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_CERTIFICATE,
             user_id,
             lifescore_id,
             certificate_hash,
             score,
             issued_at,
             expires_at,
-            json.dumps(metadata) if metadata else None
+            metadata
         )
     
+    @replica_read
+    @all_shards
     async def get_by_id(self, certificate_id: str):
         """Get certificate by ID"""
-        query = """
-            SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
-                   expires_at, status, metadata, blockchain_tx_hash, created_at
-            FROM certificates
-            WHERE id = $1
-        """
-        return await self.db.fetch_one(query, certificate_id)
+        return await self.db.fetch_one(GET_BY_ID, certificate_id)
     
+    @replica_read
+    @all_shards
     async def get_by_hash(self, certificate_hash: str):
         """Get certificate by hash"""
-        query = """
-            SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
-                   expires_at, status, metadata, blockchain_tx_hash, created_at
-            FROM certificates
-            WHERE certificate_hash = $1
-        """
-        return await self.db.fetch_one(query, certificate_hash)
+        return await self.db.fetch_one(GET_BY_HASH, certificate_hash)
     
+    @replica_read
+    @sharded("user_id")
     async def get_user_certificates(self, user_id: str):
         """Get all certificates for a user"""
-        query = """
-            SELECT id, user_id, lifescore_id, certificate_hash, score, issued_at,
-                   expires_at, status, metadata, blockchain_tx_hash, created_at
-            FROM certificates
-            WHERE user_id = $1
-            ORDER BY issued_at DESC
-        """
-        return await self.db.fetch_all(query, user_id)
+        return await self.db.fetch_all(GET_USER_CERTIFICATES, user_id)
     
+    @all_shards
     async def revoke_certificate(self, certificate_id: str):
         """Revoke a certificate"""
-        query = """
-            UPDATE certificates
-            SET status = 'revoked'
-            WHERE id = $1
-        """
-        await self.db.execute(query, certificate_id)
+        await self.db.execute(REVOKE_CERTIFICATE, certificate_id)
     
+    @all_shards
     async def update_blockchain_hash(self, certificate_id: str, tx_hash: str):
         """Update certificate with blockchain transaction hash"""
-        query = """
-            UPDATE certificates
-            SET blockchain_tx_hash = $2
-            WHERE id = $1
-        """
-        await self.db.execute(query, certificate_id, tx_hash)
+        await self.db.execute(UPDATE_BLOCKCHAIN_HASH, certificate_id, tx_hash)
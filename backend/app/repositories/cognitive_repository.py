@@ -1,49 +1,90 @@
 from typing import Optional, Dict, Any
-from ..core.database import Database
+from ..core.database import Database, sharded, all_shards
+from ..core.queries import queries
 from ..core.logging import get_logger
-import json
 
 logger = get_logger(__name__)
 
 
+CREATE_TEST = queries.register("cognitive.create_test", """
+    INSERT INTO cognitive_tests (user_id, test_type, status)
+    VALUES ($1, $2, 'started')
+    RETURNING id, user_id, test_type, status, started_at, created_at
+""")
+
+GET_TEST = queries.register("cognitive.get_test", """
+    SELECT id, user_id, test_type, status, started_at, completed_at,
+           time_taken_seconds, raw_data, created_at
+    FROM cognitive_tests
+    WHERE id = $1
+""")
+
+COMPLETE_TEST = queries.register("cognitive.complete_test", """
+    UPDATE cognitive_tests
+    SET status = 'completed',
+        completed_at = NOW(),
+        time_taken_seconds = $2,
+        raw_data = $3
+    WHERE id = $1
+    RETURNING id, user_id, test_type, status, completed_at, time_taken_seconds
+""")
+
+CREATE_SCORE = queries.register("cognitive.create_score", """
+    INSERT INTO cognitive_scores 
+    (user_id, test_id, accuracy_score, speed_score, difficulty_score, 
+     composite_score, score_breakdown)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    RETURNING id, user_id, test_id, accuracy_score, speed_score, 
+              difficulty_score, composite_score, percentile, score_breakdown, created_at
+""")
+
+GET_SCORE_BY_TEST_ID = queries.register("cognitive.get_score_by_test_id", """
+    SELECT id, user_id, test_id, accuracy_score, speed_score, difficulty_score,
+           composite_score, percentile, score_breakdown, created_at
+    FROM cognitive_scores
+    WHERE test_id = $1
+""")
+
+GET_USER_SCORES = queries.register("cognitive.get_user_scores", """
+    SELECT cs.id, cs.user_id, cs.test_id, cs.accuracy_score, cs.speed_score,
+           cs.difficulty_score, cs.composite_score, cs.percentile, 
+           cs.score_breakdown, cs.created_at, ct.test_type
+    FROM cognitive_scores cs
+    JOIN cognitive_tests ct ON cs.test_id = ct.id
+    WHERE cs.user_id = $1
+    ORDER BY cs.created_at DESC
+    LIMIT $2
+""")
+
+GET_LATEST_SCORE = queries.register("cognitive.get_latest_score", """
+    SELECT composite_score
+    FROM latest_cognitive_scores
+    WHERE user_id = $1
+""")
+
+
 class CognitiveRepository:
     """Repository for cognitive test operations"""
     
     def __init__(self, db: Database):
         self.db = db
     
+    @sharded("user_id")
     async def create_test(self, user_id: str, test_type: str):
         """Create a new cognitive test"""
-        query = """
-            INSERT INTO cognitive_tests (user_id, test_type, status)
-            VALUES ($1, $2, 'started')
-            RETURNING id, user_id, test_type, status, started_at, created_at
-        """
-        return await self.db.fetch_one(query, user_id, test_type)
+        return await self.db.fetch_one(CREATE_TEST, user_id, test_type)
     
+    @all_shards
     async def get_test(self, test_id: str):
         """Get a test by ID"""
-        query = """
-            SELECT id, user_id, test_type, status, started_at, completed_at,
-                   time_taken_seconds, raw_data, created_at
-            FROM cognitive_tests
-            WHERE id = $1
-        """
-        return await self.db.fetch_one(query, test_id)
+        return await self.db.fetch_one(GET_TEST, test_id)
     
+    @all_shards
     async def complete_test(self, test_id: str, time_taken: int, raw_data: Dict[str, Any]):
         """Mark test as completed"""
-        query = """
-            UPDATE cognitive_tests
-            SET status = 'completed',
-                completed_at = NOW(),
-                time_taken_seconds = $2,
-                raw_data = $3
-            WHERE id = $1
-            RETURNING id, user_id, test_type, status, completed_at, time_taken_seconds
-        """
-        return await self.db.fetch_one(query, test_id, time_taken, json.dumps(raw_data))
+        return await self.db.fetch_one(COMPLETE_TEST, test_id, time_taken, raw_data)
     
+    @sharded("user_id")
     async def create_score(
         self,
         user_id: str,
@@ -55,55 +96,29 @@ class CognitiveRepository:
         score_breakdown: Optional[Dict[str, Any]] = None
     ):
         """Create a cognitive score"""
-        query = """
-            INSERT INTO cognitive_scores 
-            (user_id, test_id, accuracy_score, speed_score, difficulty_score, 
-             composite_score, score_breakdown)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id, user_id, test_id, accuracy_score, speed_score, 
-                      difficulty_score, composite_score, percentile, score_breakdown, created_at
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_SCORE,
             user_id,
             test_id,
             accuracy_score,
             speed_score,
             difficulty_score,
             composite_score,
-            json.dumps(score_breakdown) if score_breakdown else None
+            score_breakdown
         )
     
+    @all_shards
     async def get_score_by_test_id(self, test_id: str):
         """Get score for a specific test"""
-        query = """
-            SELECT id, user_id, test_id, accuracy_score, speed_score, difficulty_score,
-                   composite_score, percentile, score_breakdown, created_at
-            FROM cognitive_scores
-            WHERE test_id = $1
-        """
-        return await self.db.fetch_one(query, test_id)
+        return await self.db.fetch_one(GET_SCORE_BY_TEST_ID, test_id)
     
+    @sharded("user_id")
     async def get_user_scores(self, user_id: str, limit: int = 10):
         """Get all scores for a user"""
-        query = """
-            SELECT cs.id, cs.user_id, cs.test_id, cs.accuracy_score, cs.speed_score,
-                   cs.difficulty_score, cs.composite_score, cs.percentile, 
-                   cs.score_breakdown, cs.created_at, ct.test_type
-            FROM cognitive_scores cs
-            JOIN cognitive_tests ct ON cs.test_id = ct.id
-            WHERE cs.user_id = $1
-            ORDER BY cs.created_at DESC
-            LIMIT $2
-        """
-        return await self.db.fetch_all(query, user_id, limit)
+        return await self.db.fetch_all(GET_USER_SCORES, user_id, limit)
     
+    @sharded("user_id")
     async def get_latest_score(self, user_id: str):
         """Get the latest cognitive score for a user"""
-        query = """
-            SELECT composite_score
-            FROM latest_cognitive_scores
-            WHERE user_id = $1
-        """
-        result = await self.db.fetch_one(query, user_id)
+        result = await self.db.fetch_one(GET_LATEST_SCORE, user_id)
         return result['composite_score'] if result else None
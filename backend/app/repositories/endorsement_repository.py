@@ -1,15 +1,66 @@
-from ..core.database import Database
+from ..core.database import Database, sharded, all_shards
+from ..core.queries import queries
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+CREATE = queries.register("endorsements.create", """
+    INSERT INTO endorsements (user_id, endorser_id, skill, message)
+    VALUES ($1, $2, $3, $4)
+    RETURNING id, user_id, endorser_id, skill, message, status, weight, created_at, updated_at
+""")
+
+GET_BY_ID = queries.register("endorsements.get_by_id", """
+    SELECT id, user_id, endorser_id, skill, message, status, weight, created_at, updated_at
+    FROM endorsements
+    WHERE id = $1
+""")
+
+GET_USER_ENDORSEMENTS_BY_STATUS = queries.register("endorsements.get_user_endorsements_by_status", """
+    SELECT id, user_id, endorser_id, skill, message, status, weight, created_at
+    FROM endorsements
+    WHERE user_id = $1 AND status = $2
+    ORDER BY created_at DESC
+""")
+
+GET_USER_ENDORSEMENTS = queries.register("endorsements.get_user_endorsements", """
+    SELECT id, user_id, endorser_id, skill, message, status, weight, created_at
+    FROM endorsements
+    WHERE user_id = $1
+    ORDER BY created_at DESC
+""")
+
+UPDATE_STATUS_WITH_WEIGHT = queries.register("endorsements.update_status_with_weight", """
+    UPDATE endorsements
+    SET status = $2, weight = $3, updated_at = NOW()
+    WHERE id = $1
+    RETURNING id, user_id, endorser_id, skill, status, weight, updated_at
+""")
+
+UPDATE_STATUS = queries.register("endorsements.update_status", """
+    UPDATE endorsements
+    SET status = $2, updated_at = NOW()
+    WHERE id = $1
+    RETURNING id, user_id, endorser_id, skill, status, weight, updated_at
+""")
+
+CALCULATE_ENDORSEMENT_SCORE = queries.register("endorsements.calculate_endorsement_score", """
+    SELECT calculate_endorsement_score($1)
+""")
+
+DELETE = queries.register("endorsements.delete", """
+    DELETE FROM endorsements WHERE id = $1
+""")
+
+
 class EndorsementRepository:
     """Repository for endorsement operations"""
     
     def __init__(self, db: Database):
         self.db = db
     
+    @sharded("user_id")
     async def create(
         self,
         user_id: str,
@@ -18,67 +69,36 @@ class EndorsementRepository:
         message: str = None
     ):
         """Create a new endorsement"""
-        query = """
-            INSERT INTO endorsements (user_id, endorser_id, skill, message)
-            VALUES ($1, $2, $3, $4)
-            RETURNING id, user_id, endorser_id, skill, message, status, weight, created_at, updated_at
-        """
-        return await self.db.fetch_one(query, user_id, endorser_id, skill, message)
+        return await self.db.fetch_one(CREATE, user_id, endorser_id, skill, message)
     
+    @all_shards
     async def get_by_id(self, endorsement_id: str):
         """Get endorsement by ID"""
-        query = """
-            SELECT id, user_id, endorser_id, skill, message, status, weight, created_at, updated_at
-            FROM endorsements
-            WHERE id = $1
-        """
-        return await self.db.fetch_one(query, endorsement_id)
+        return await self.db.fetch_one(GET_BY_ID, endorsement_id)
     
+    @sharded("user_id")
     async def get_user_endorsements(self, user_id: str, status: str = None):
         """Get endorsements for a user"""
         if status:
-            query = """
-                SELECT id, user_id, endorser_id, skill, message, status, weight, created_at
-                FROM endorsements
-                WHERE user_id = $1 AND status = $2
-                ORDER BY created_at DESC
-            """
-            return await self.db.fetch_all(query, user_id, status)
+            return await self.db.fetch_all(GET_USER_ENDORSEMENTS_BY_STATUS, user_id, status)
         else:
-            query = """
-                SELECT id, user_id, endorser_id, skill, message, status, weight, created_at
-                FROM endorsements
-                WHERE user_id = $1
-                ORDER BY created_at DESC
-            """
-            return await self.db.fetch_all(query, user_id)
+            return await self.db.fetch_all(GET_USER_ENDORSEMENTS, user_id)
     
+    @all_shards
     async def update_status(self, endorsement_id: str, status: str, weight: float = None):
         """Update endorsement status"""
         if weight is not None:
-            query = """
-                UPDATE endorsements
-                SET status = $2, weight = $3, updated_at = NOW()
-                WHERE id = $1
-                RETURNING id, user_id, endorser_id, skill, status, weight, updated_at
-            """
-            return await self.db.fetch_one(query, endorsement_id, status, weight)
+            return await self.db.fetch_one(UPDATE_STATUS_WITH_WEIGHT, endorsement_id, status, weight)
         else:
-            query = """
-                UPDATE endorsements
-                SET status = $2, updated_at = NOW()
-                WHERE id = $1
-                RETURNING id, user_id, endorser_id, skill, status, weight, updated_at
-            """
-            return await self.db.fetch_one(query, endorsement_id, status)
+            return await self.db.fetch_one(UPDATE_STATUS, endorsement_id, status)
     
+    @sharded("user_id")
     async def calculate_endorsement_score(self, user_id: str) -> float:
         """Calculate endorsement score for a user"""
-        query = "SELECT calculate_endorsement_score($1)"
-        result = await self.db.fetch_val(query, user_id)
+        result = await self.db.fetch_val(CALCULATE_ENDORSEMENT_SCORE, user_id)
         return float(result) if result else 0.0
     
+    @all_shards
     async def delete(self, endorsement_id: str):
         """Delete an endorsement"""
-        query = "DELETE FROM endorsements WHERE id = $1"
-        await self.db.execute(query, endorsement_id)
+        await self.db.execute(DELETE, endorsement_id)
@@ -0,0 +1,206 @@
+from typing import Dict, Any, List, Sequence
+from ..core.database import UnitOfWork
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Staging tables live for one transaction. The merge statements below reference
+# them, so they stay plain SQL rather than registered (pool-prepared) queries.
+CREATE_STAGING = """
+    CREATE TEMP TABLE import_users (
+        id UUID NOT NULL,
+        firebase_uid VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        display_name VARCHAR(255),
+        created_at TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DROP;
+
+    CREATE TEMP TABLE import_profiles (
+        firebase_uid VARCHAR(255) NOT NULL,
+        bio TEXT,
+        avatar_url VARCHAR(500),
+        github_username VARCHAR(255),
+        linkedin_url VARCHAR(500),
+        website_url VARCHAR(500),
+        location VARCHAR(255),
+        skills TEXT[]
+    ) ON COMMIT DROP;
+
+    CREATE TEMP TABLE import_cognitive_scores (
+        firebase_uid VARCHAR(255) NOT NULL,
+        test_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        test_type VARCHAR(100) NOT NULL,
+        accuracy_score FLOAT8 NOT NULL,
+        speed_score FLOAT8 NOT NULL,
+        difficulty_score FLOAT8 NOT NULL,
+        composite_score FLOAT8 NOT NULL,
+        percentile FLOAT8,
+        score_breakdown JSONB,
+        taken_at TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DROP;
+
+    CREATE TEMP TABLE import_lifescores (
+        firebase_uid VARCHAR(255) NOT NULL,
+        cognitive_score FLOAT8,
+        portfolio_score FLOAT8,
+        endorsement_score FLOAT8,
+        composite_score FLOAT8 NOT NULL,
+        score_breakdown JSONB,
+        created_at TIMESTAMP WITH TIME ZONE
+    ) ON COMMIT DROP;
+"""
+
+STAGING_COLUMNS = {
+    "import_users": ("id", "firebase_uid", "email", "display_name", "created_at"),
+    "import_profiles": (
+        "firebase_uid", "bio", "avatar_url", "github_username", "linkedin_url",
+        "website_url", "location", "skills"
+    ),
+    "import_cognitive_scores": (
+        "firebase_uid", "test_type", "accuracy_score", "speed_score", "difficulty_score",
+        "composite_score", "percentile", "score_breakdown", "taken_at"
+    ),
+    "import_lifescores": (
+        "firebase_uid", "cognitive_score", "portfolio_score", "endorsement_score",
+        "composite_score", "score_breakdown", "created_at"
+    ),
+}
+
+MERGE_USERS = """
+    WITH merged AS (
+        INSERT INTO users (id, firebase_uid, email, display_name, created_at)
+        SELECT DISTINCT ON (s.firebase_uid)
+               s.id, s.firebase_uid, s.email, s.display_name, COALESCE(s.created_at, NOW())
+        FROM import_users s
+        -- Email conflicts are filtered out beforehand; this covers users created meanwhile
+        WHERE NOT EXISTS (
+            SELECT 1 FROM users u WHERE u.email = s.email AND u.firebase_uid <> s.firebase_uid
+        )
+        ORDER BY s.firebase_uid
+        ON CONFLICT (firebase_uid) DO UPDATE SET
+            display_name = COALESCE(EXCLUDED.display_name, users.display_name),
+            updated_at = NOW()
+        RETURNING (xmax = 0) AS created
+    )
+    SELECT COUNT(*) FILTER (WHERE created) AS created,
+           COUNT(*) FILTER (WHERE NOT created) AS updated
+    FROM merged
+"""
+
+MERGE_PROFILES = """
+    WITH staged AS (
+        SELECT DISTINCT ON (p.firebase_uid) u.id AS user_id, p.*
+        FROM import_profiles p
+        JOIN users u ON u.firebase_uid = p.firebase_uid
+        ORDER BY p.firebase_uid
+    ),
+    updated AS (
+        UPDATE profiles up SET
+            bio = COALESCE(s.bio, up.bio),
+            avatar_url = COALESCE(s.avatar_url, up.avatar_url),
+            github_username = COALESCE(s.github_username, up.github_username),
+            linkedin_url = COALESCE(s.linkedin_url, up.linkedin_url),
+            website_url = COALESCE(s.website_url, up.website_url),
+            location = COALESCE(s.location, up.location),
+            skills = COALESCE(s.skills, up.skills),
+            updated_at = NOW()
+        FROM staged s
+        WHERE up.user_id = s.user_id
+        RETURNING up.user_id
+    ),
+    inserted AS (
+        INSERT INTO profiles (user_id, bio, avatar_url, github_username,
+                                   linkedin_url, website_url, location, skills)
+        SELECT s.user_id, s.bio, s.avatar_url, s.github_username,
+               s.linkedin_url, s.website_url, s.location, s.skills
+        FROM staged s
+        WHERE s.user_id NOT IN (SELECT user_id FROM updated)
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM inserted) AS created,
+           (SELECT COUNT(*) FROM updated) AS updated
+"""
+
+# Each imported score gets a completed cognitive_tests row carrying the staged test_id
+MERGE_COGNITIVE_SCORES = """
+    WITH staged AS (
+        SELECT s.*, u.id AS user_id, COALESCE(s.taken_at, NOW()) AS at
+        FROM import_cognitive_scores s
+        JOIN users u ON u.firebase_uid = s.firebase_uid
+    ),
+    tests AS (
+        INSERT INTO cognitive_tests (id, user_id, test_type, status, started_at,
+                                     completed_at, created_at)
+        SELECT test_id, user_id, test_type, 'completed', at, at, at
+        FROM staged
+        RETURNING id
+    ),
+    scores AS (
+        INSERT INTO cognitive_scores (user_id, test_id, accuracy_score, speed_score,
+                                      difficulty_score, composite_score, percentile,
+                                      score_breakdown, created_at)
+        SELECT s.user_id, s.test_id, s.accuracy_score, s.speed_score,
+               s.difficulty_score, s.composite_score, s.percentile,
+               s.score_breakdown, s.at
+        FROM staged s
+        JOIN tests t ON t.id = s.test_id
+        RETURNING 1
+    )
+    SELECT COUNT(*) AS created FROM scores
+"""
+
+MERGE_LIFESCORES = """
+    WITH inserted AS (
+        INSERT INTO lifescore_history (user_id, cognitive_score, portfolio_score,
+                                       endorsement_score, composite_score,
+                                       score_breakdown, created_at)
+        SELECT u.id, s.cognitive_score, s.portfolio_score, s.endorsement_score,
+               s.composite_score, s.score_breakdown, COALESCE(s.created_at, NOW())
+        FROM import_lifescores s
+        JOIN users u ON u.firebase_uid = s.firebase_uid
+        RETURNING 1
+    )
+    SELECT COUNT(*) AS created FROM inserted
+"""
+
+
+class BulkImportRepository:
+    """Staging (binary COPY) and set-based merges for bulk imports; needs a transactional unit of work"""
+
+    def __init__(self, db: UnitOfWork):
+        self.db = db
+
+    async def create_staging_tables(self):
+        """Create the per-transaction staging tables"""
+        await self.db.execute(CREATE_STAGING)
+
+    async def stage(self, table: str, rows: Sequence[Dict[str, Any]]) -> int:
+        """Binary COPY rows (dicts keyed by column) into a staging table"""
+        if not rows:
+            return 0
+
+        columns = STAGING_COLUMNS[table]
+        async with self.db.get_connection() as conn:
+            await conn.copy_records_to_table(
+                table,
+                records=[tuple(row.get(column) for column in columns) for row in rows],
+                columns=columns
+            )
+        return len(rows)
+
+    async def merge_users(self) -> Dict[str, int]:
+        """Upsert staged users by firebase_uid; new users take the staged (uid-derived) id"""
+        return await self.db.fetch_one(MERGE_USERS)
+
+    async def merge_profiles(self) -> Dict[str, int]:
+        """Update or create profiles for staged rows whose user exists"""
+        return await self.db.fetch_one(MERGE_PROFILES)
+
+    async def merge_cognitive_scores(self) -> Dict[str, int]:
+        """Insert staged cognitive scores with a completed test per score"""
+        return await self.db.fetch_one(MERGE_COGNITIVE_SCORES)
+
+    async def merge_lifescores(self) -> Dict[str, int]:
+        """Append staged rows to lifescore_history"""
+        return await self.db.fetch_one(MERGE_LIFESCORES)
@@ -1,17 +1,105 @@
-from typing import Dict, Any, Optional
-from ..core.database import Database
+import heapq
+from typing import Dict, Any, List, Optional
+from ..core.database import Database, replica_read, use_pool, sharded, all_shards
+from ..core.queries import queries
+from ..core.responses import RecordMapping
 from ..core.logging import get_logger
-import json
 
 logger = get_logger(__name__)
 
 
+CREATE_SCORE = queries.register("lifescore.create_score", """
+    INSERT INTO lifescore_history
+    (user_id, cognitive_score, portfolio_score, endorsement_score,
+     composite_score, score_breakdown)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id, user_id, cognitive_score, portfolio_score, endorsement_score,
+              composite_score, score_breakdown, rank, percentile, created_at
+""")
+
+GET_LATEST_SCORE = queries.register("lifescore.get_latest_score", """
+    SELECT id, user_id, cognitive_score, portfolio_score, endorsement_score,
+           composite_score, score_breakdown, rank, percentile, created_at
+    FROM latest_lifescores
+    WHERE user_id = $1
+""")
+
+GET_SCORE_HISTORY = queries.register("lifescore.get_score_history", """
+    SELECT id, user_id, cognitive_score, portfolio_score, endorsement_score,
+           composite_score, score_breakdown, rank, percentile, created_at
+    FROM lifescore_history
+    WHERE user_id = $1
+    ORDER BY created_at DESC
+    LIMIT $2
+""")
+
+SET_POSITION = queries.register("lifescore.set_position", """
+    UPDATE lifescore_history
+    SET rank = $2, percentile = $3
+    WHERE id = $1
+""")
+
+# Stored positions are refreshed from the rank index (RankIndex.load), changed rows only
+SET_POSITIONS = queries.register("lifescore.set_positions", """
+    UPDATE lifescore_history ls
+    SET rank = p.rank, percentile = p.percentile
+    FROM UNNEST($1::uuid[], $2::int[], $3::numeric[]) AS p(id, rank, percentile)
+    WHERE ls.id = p.id
+""")
+
+GET_LATEST_SCORES = queries.register("lifescore.get_latest_scores", """
+    SELECT DISTINCT ON (user_id) id, user_id, composite_score, rank, percentile
+    FROM lifescore_history
+    ORDER BY user_id, created_at DESC
+""")
+
+GET_LEADERBOARD = queries.register("lifescore.get_leaderboard", """
+    SELECT id, display_name, email, lifescore, cognitive_score,
+           portfolio_score, endorsement_score, rank, percentile
+    FROM user_leaderboard
+    LIMIT $1
+""")
+
+LEADERBOARD_COLUMNS = RecordMapping(
+    "id", "display_name", "email", "lifescore", "cognitive_score",
+    "portfolio_score", "endorsement_score", "rank", "percentile"
+)
+
+SCORES_SQL = """
+    SELECT u.id, u.email, u.display_name,
+           ls.composite_score as lifescore,
+           ls.cognitive_score,
+           ls.portfolio_score,
+           ls.endorsement_score,
+           ls.rank,
+           ls.created_at
+    FROM users u
+    LEFT JOIN latest_lifescores ls ON u.id = ls.user_id
+    ORDER BY ls.composite_score DESC NULLS LAST
+"""
+
+GET_ALL_SCORES = queries.register("lifescore.get_all_scores", f"{SCORES_SQL} LIMIT $1")
+
+EXPORT_SCORES = queries.register("lifescore.export_scores", SCORES_SQL)
+
+SCORE_LIST_COLUMNS = RecordMapping(
+    "id", "email", "display_name", "lifescore", "cognitive_score",
+    "portfolio_score", "endorsement_score", "rank", "created_at"
+)
+
+
+def _by_lifescore(row):
+    # Users without a score (NULL lifescore) sort last, as in the queries
+    return (row['lifescore'] is not None, row['lifescore'] or 0)
+
+
 class LifeScoreRepository:
     """Repository for LifeScore operations"""
     
     def __init__(self, db: Database):
         self.db = db
     
+    @sharded("user_id")
     async def create_score(
         self,
         user_id: str,
@@ -22,77 +110,66 @@ class LifeScoreRepository:
         score_breakdown: Optional[Dict[str, Any]] = None
     ):
         """Create a LifeScore record"""
-        query = """
-            INSERT INTO lifescore_history
-            (user_id, cognitive_score, portfolio_score, endorsement_score,
-             composite_score, score_breakdown)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            RETURNING id, user_id, cognitive_score, portfolio_score, endorsement_score,
-                      composite_score, score_breakdown, rank, percentile, created_at
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_SCORE,
             user_id,
             cognitive_score,
             portfolio_score,
             endorsement_score,
             composite_score,
-            json.dumps(score_breakdown) if score_breakdown else None
+            score_breakdown
         )
     
+    @replica_read
+    @sharded("user_id")
     async def get_latest_score(self, user_id: str):
         """Get the latest LifeScore for a user"""
-        query = """
-            SELECT id, user_id, cognitive_score, portfolio_score, endorsement_score,
-                   composite_score, score_breakdown, rank, percentile, created_at
-            FROM latest_lifescores
-            WHERE user_id = $1
-        """
-        return await self.db.fetch_one(query, user_id)
+        return await self.db.fetch_one(GET_LATEST_SCORE, user_id)
     
+    @replica_read
+    @sharded("user_id")
     async def get_score_history(self, user_id: str, limit: int = 10):
         """Get LifeScore history for a user"""
-        query = """
-            SELECT id, user_id, cognitive_score, portfolio_score, endorsement_score,
-                   composite_score, score_breakdown, rank, percentile, created_at
-            FROM lifescore_history
-            WHERE user_id = $1
-            ORDER BY created_at DESC
-            LIMIT $2
-        """
-        return await self.db.fetch_all(query, user_id, limit)
+        return await self.db.fetch_all(GET_SCORE_HISTORY, user_id, limit)
     
-    async def update_rankings(self):
-        """Update rankings for all users (run periodically)"""
-        query = """
-            WITH ranked_scores AS (
-                SELECT 
-                    id,
-                    user_id,
-                    composite_score,
-                    ROW_NUMBER() OVER (ORDER BY composite_score DESC) as rank,
-                    PERCENT_RANK() OVER (ORDER BY composite_score) * 100 as percentile
-                FROM lifescore_history
-                WHERE id IN (
-                    SELECT DISTINCT ON (user_id) id
-                    FROM lifescore_history
-                    ORDER BY user_id, created_at DESC
-                )
-            )
-            UPDATE lifescore_history ls
-            SET rank = rs.rank,
-                percentile = rs.percentile
-            FROM ranked_scores rs
-            WHERE ls.id = rs.id
-        """
-        await self.db.execute(query)
+    @sharded("user_id")
+    async def set_position(self, user_id: str, score_id: str, rank: int, percentile: float):
+        """Store rank and percentile on a single score row"""
+        await self.db.execute(SET_POSITION, score_id, rank, percentile)
     
+    @use_pool("batch")
+    async def set_positions(self, score_ids: List[str], ranks: List[int], percentiles: List[float]):
+        """Store rank and percentile on many score rows of the current shard"""
+        await self.db.execute(SET_POSITIONS, score_ids, ranks, percentiles)
+    
+    @use_pool("batch")
+    async def get_latest_scores_by_shard(self) -> Dict[str, List[dict]]:
+        """Every user's latest score row (id, composite_score, stored position), under its shard's name"""
+        return await self.db.fetch_by_shard(GET_LATEST_SCORES)
+    
+    @replica_read
+    @all_shards
     async def get_leaderboard(self, limit: int = 100):
-        """Get the global leaderboard"""
-        query = """
-            SELECT id, display_name, email, lifescore, cognitive_score,
-                   portfolio_score, endorsement_score, rank, percentile
-            FROM user_leaderboard
-            LIMIT $1
-        """
-        return await self.db.fetch_all(query, limit)
+        """Get the global leaderboard as Records (see LEADERBOARD_COLUMNS)"""
+        rows = await self.db.fetch_records(GET_LEADERBOARD, limit)
+        if not self.db.sharded:
+            return rows
+        
+        # Every shard returned its own top `limit`; merge them and rank globally
+        top = heapq.nlargest(limit, rows, key=_by_lifescore)
+        return [{**dict(row), 'rank': rank} for rank, row in enumerate(top, 1)]
+    
+    @all_shards
+    async def get_all_scores(self, limit: int = 100):
+        """Every user's latest scores, best first, as Records (see SCORE_LIST_COLUMNS)"""
+        rows = await self.db.fetch_records(GET_ALL_SCORES, limit)
+        if not self.db.sharded:
+            return rows
+        
+        # Every shard returned its own best `limit`; merge them
+        return heapq.nlargest(limit, rows, key=_by_lifescore)
+    
+    @all_shards
+    async def export_scores(self):
+        """Stream every user's latest scores as Records, shard by shard (best first within a shard)"""
+        return self.db.stream(EXPORT_SCORES)
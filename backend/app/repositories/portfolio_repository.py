@@ -1,17 +1,106 @@
 from typing import Dict, Any, Optional, List
-from ..core.database import Database
+from ..core.database import Database, sharded, all_shards
+from ..core.queries import queries
 from ..core.logging import get_logger
-import json
 
 logger = get_logger(__name__)
 
 
+CREATE_REPO = queries.register("portfolio.create_repo", """
+    INSERT INTO github_repos 
+    (user_id, repo_name, repo_url, description, stars, forks, primary_language,
+     tech_stack, last_commit_date, created_date, is_fork)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+    ON CONFLICT (user_id, repo_name) 
+    DO UPDATE SET
+        description = EXCLUDED.description,
+        stars = EXCLUDED.stars,
+        forks = EXCLUDED.forks,
+        primary_language = EXCLUDED.primary_language,
+        tech_stack = EXCLUDED.tech_stack,
+        last_commit_date = EXCLUDED.last_commit_date,
+        updated_at = NOW()
+    RETURNING id, user_id, repo_name, repo_url, description, stars, forks,
+              primary_language, tech_stack, last_commit_date, created_date, is_fork
+""")
+
+# One row per element of the parallel arrays; tech_stack travels as jsonb[]
+# because unnest would flatten a text[][]
+UPSERT_REPOS = queries.register("portfolio.upsert_repos", """
+    INSERT INTO github_repos 
+    (user_id, repo_name, repo_url, description, stars, forks, primary_language,
+     tech_stack, last_commit_date, created_date, is_fork)
+    SELECT $1, r.repo_name, r.repo_url, r.description, r.stars, r.forks,
+           r.primary_language,
+           ARRAY(SELECT jsonb_array_elements_text(r.tech_stack)),
+           r.last_commit_date, r.created_date, r.is_fork
+    FROM unnest(
+        $2::varchar[], $3::varchar[], $4::text[], $5::int[], $6::int[],
+        $7::varchar[], $8::jsonb[], $9::timestamptz[], $10::timestamptz[], $11::bool[]
+    ) AS r(repo_name, repo_url, description, stars, forks, primary_language,
+           tech_stack, last_commit_date, created_date, is_fork)
+    ON CONFLICT (user_id, repo_name) 
+    DO UPDATE SET
+        description = EXCLUDED.description,
+        stars = EXCLUDED.stars,
+        forks = EXCLUDED.forks,
+        primary_language = EXCLUDED.primary_language,
+        tech_stack = EXCLUDED.tech_stack,
+        last_commit_date = EXCLUDED.last_commit_date,
+        updated_at = NOW()
+    RETURNING id, user_id, repo_name, repo_url, description, stars, forks,
+              primary_language, tech_stack, last_commit_date, created_date, is_fork
+""")
+
+GET_USER_REPOS = queries.register("portfolio.get_user_repos", """
+    SELECT id, user_id, repo_name, repo_url, description, stars, forks,
+           primary_language, tech_stack, last_commit_date, created_date, is_fork
+    FROM github_repos
+    WHERE user_id = $1
+    ORDER BY stars DESC, last_commit_date DESC
+""")
+
+CREATE_METRICS = queries.register("portfolio.create_metrics", """
+    INSERT INTO github_metrics
+    (user_id, total_repos, total_stars, total_commits, total_prs, total_issues,
+     languages, contributions_last_year, account_age_days)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id, user_id, total_repos, total_stars, total_commits, total_prs,
+              total_issues, languages, contributions_last_year, account_age_days, analyzed_at
+""")
+
+CREATE_SCORE = queries.register("portfolio.create_score", """
+    INSERT INTO portfolio_scores
+    (user_id, metrics_id, repo_quality_score, activity_score, impact_score,
+     composite_score, score_breakdown)
+    VALUES ($1, $2, $3, $4, $5, $6, $7)
+    RETURNING id, user_id, metrics_id, repo_quality_score, activity_score,
+              impact_score, composite_score, score_breakdown, created_at
+""")
+
+GET_LATEST_SCORE = queries.register("portfolio.get_latest_score", """
+    SELECT composite_score
+    FROM latest_portfolio_scores
+    WHERE user_id = $1
+""")
+
+GET_LATEST_SCORE_DETAILS = queries.register("portfolio.get_latest_score_details", """
+    SELECT id, user_id, repo_quality_score, activity_score, impact_score,
+           composite_score, score_breakdown, created_at
+    FROM portfolio_scores
+    WHERE user_id = $1
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+
+
 class PortfolioRepository:
     """Repository for portfolio/GitHub operations"""
     
     def __init__(self, db: Database):
         self.db = db
     
+    @sharded("user_id")
     async def create_repo(
         self,
         user_id: str,
@@ -27,25 +116,8 @@ class PortfolioRepository:
         is_fork: bool = False
     ):
         """Create or update a GitHub repository record"""
-        query = """
-            INSERT INTO github_repos 
-            (user_id, repo_name, repo_url, description, stars, forks, primary_language,
-             tech_stack, last_commit_date, created_date, is_fork)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-            ON CONFLICT (user_id, repo_name) 
-            DO UPDATE SET
-                description = EXCLUDED.description,
-                stars = EXCLUDED.stars,
-                forks = EXCLUDED.forks,
-                primary_language = EXCLUDED.primary_language,
-                tech_stack = EXCLUDED.tech_stack,
-                last_commit_date = EXCLUDED.last_commit_date,
-                updated_at = NOW()
-            RETURNING id, user_id, repo_name, repo_url, description, stars, forks,
-                      primary_language, tech_stack, last_commit_date, created_date, is_fork
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_REPO,
             user_id,
             repo_name,
             repo_url,
@@ -59,17 +131,39 @@ class PortfolioRepository:
             is_fork
         )
     
+    @sharded("user_id")
+    async def upsert_repos(self, user_id: str, repos: List[Dict[str, Any]]):
+        """
+        Create or update many GitHub repository records in one statement.
+        Each dict takes the create_repo keyword arguments (minus user_id).
+        """
+        # ON CONFLICT cannot touch the same row twice in one statement
+        by_name = {repo['repo_name']: repo for repo in repos}
+        if not by_name:
+            return []
+        
+        rows = list(by_name.values())
+        return await self.db.fetch_all(
+            UPSERT_REPOS,
+            user_id,
+            [r['repo_name'] for r in rows],
+            [r['repo_url'] for r in rows],
+            [r.get('description') for r in rows],
+            [r.get('stars', 0) for r in rows],
+            [r.get('forks', 0) for r in rows],
+            [r.get('primary_language') for r in rows],
+            [r.get('tech_stack') or [] for r in rows],
+            [r.get('last_commit_date') for r in rows],
+            [r.get('created_date') for r in rows],
+            [r.get('is_fork', False) for r in rows]
+        )
+    
+    @sharded("user_id")
     async def get_user_repos(self, user_id: str):
         """Get all repositories for a user"""
-        query = """
-            SELECT id, user_id, repo_name, repo_url, description, stars, forks,
-                   primary_language, tech_stack, last_commit_date, created_date, is_fork
-            FROM github_repos
-            WHERE user_id = $1
-            ORDER BY stars DESC, last_commit_date DESC
-        """
-        return await self.db.fetch_all(query, user_id)
+        return await self.db.fetch_all(GET_USER_REPOS, user_id)
     
+    @sharded("user_id")
     async def create_metrics(
         self,
         user_id: str,
@@ -83,27 +177,20 @@ class PortfolioRepository:
         account_age_days: Optional[int] = None
     ):
         """Create GitHub metrics record"""
-        query = """
-            INSERT INTO github_metrics
-            (user_id, total_repos, total_stars, total_commits, total_prs, total_issues,
-             languages, contributions_last_year, account_age_days)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-            RETURNING id, user_id, total_repos, total_stars, total_commits, total_prs,
-                      total_issues, languages, contributions_last_year, account_age_days, analyzed_at
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_METRICS,
             user_id,
             total_repos,
             total_stars,
             total_commits,
             total_prs,
             total_issues,
-            json.dumps(languages),
+            languages,
             contributions_last_year,
             account_age_days
         )
     
+    @sharded("user_id")
     async def create_score(
         self,
         user_id: str,
@@ -115,31 +202,24 @@ class PortfolioRepository:
         score_breakdown: Optional[Dict[str, Any]] = None
     ):
         """Create a portfolio score"""
-        query = """
-            INSERT INTO portfolio_scores
-            (user_id, metrics_id, repo_quality_score, activity_score, impact_score,
-             composite_score, score_breakdown)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id, user_id, metrics_id, repo_quality_score, activity_score,
-                      impact_score, composite_score, score_breakdown, created_at
-        """
         return await self.db.fetch_one(
-            query,
+            CREATE_SCORE,
             user_id,
             metrics_id,
             repo_quality_score,
             activity_score,
             impact_score,
             composite_score,
-            json.dumps(score_breakdown) if score_breakdown else None
+            score_breakdown
         )
     
+    @sharded("user_id")
     async def get_latest_score(self, user_id: str):
         """Get the latest portfolio score for a user"""
-        query = """
-            SELECT composite_score
-            FROM latest_portfolio_scores
-            WHERE user_id = $1
-        """
-        result = await self.db.fetch_one(query, user_id)
+        result = await self.db.fetch_one(GET_LATEST_SCORE, user_id)
         return result['composite_score'] if result else None
+    
+    @sharded("user_id")
+    async def get_latest_score_details(self, user_id: str):
+        """Get the latest portfolio score row for a user"""
+        return await self.db.fetch_one(GET_LATEST_SCORE_DETAILS, user_id)
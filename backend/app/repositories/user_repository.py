@@ -1,56 +1,124 @@
 from typing import Optional, List
 from uuid import UUID
-from app.core.database import Database
+from app.core.database import Database, replica_read, sharded, all_shards, on_shard, user_id_for_uid
+from app.core.queries import queries
+from app.core.cache import user_cache
+from app.core.responses import RecordMapping
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
+GET_BY_ID = queries.register("users.get_by_id", """
+    SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
+           created_at, updated_at, last_login
+    FROM users
+    WHERE id = $1
+""")
+
+GET_BY_FIREBASE_UID = queries.register("users.get_by_firebase_uid", """
+    SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
+           created_at, updated_at, last_login
+    FROM users
+    WHERE firebase_uid = $1
+""")
+
+FIND_BY_FIREBASE_UIDS_OR_EMAILS = queries.register("users.find_by_firebase_uids_or_emails", """
+    SELECT id, firebase_uid, email
+    FROM users
+    WHERE firebase_uid = ANY($1::varchar[]) OR email = ANY($2::varchar[])
+""")
+
+GET_BY_EMAIL = queries.register("users.get_by_email", """
+    SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
+           created_at, updated_at, last_login
+    FROM users
+    WHERE email = $1
+""")
+
+CREATE = queries.register("users.create", """
+    INSERT INTO users (id, firebase_uid, email, display_name)
+    VALUES ($1, $2, $3, $4)
+    RETURNING id, firebase_uid, email, display_name, role, is_active, created_at
+""")
+
+GET_ALL = queries.register("users.get_all", """
+    SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
+           created_at, last_login
+    FROM users
+    ORDER BY created_at DESC
+    LIMIT $1 OFFSET $2
+""")
+
+EXPORT_USERS = queries.register("users.export", """
+    SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
+           created_at, last_login
+    FROM users
+    ORDER BY created_at DESC
+""")
+
+USER_LIST_COLUMNS = RecordMapping(
+    "id", "firebase_uid", "email", "display_name", "role", "is_active",
+    "is_banned", "created_at", "last_login"
+)
+
+BAN_USER = queries.register("users.ban_user", """
+    UPDATE users SET is_banned = TRUE WHERE id = $1
+""")
+
+GET_PROFILE = queries.register("users.get_profile", """
+    SELECT id, user_id, bio, avatar_url, github_username, linkedin_url,
+           website_url, location, skills, created_at, updated_at
+    FROM user_profiles
+    WHERE user_id = $1
+""")
+
+GET_STATS = queries.register("users.get_stats", """
+    SELECT * FROM get_user_stats($1)
+""")
+
+DELETE = queries.register("users.delete", """
+    DELETE FROM users WHERE id = $1
+""")
+
+
 class UserRepository:
     """Repository for user-related database operations"""
     
     def __init__(self, db: Database):
         self.db = db
     
+    @replica_read
+    @sharded("user_id")
     async def get_by_id(self, user_id: str):
         """Get user by ID"""
-        query = """
-            SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
-                   created_at, updated_at, last_login
-            FROM users
-            WHERE id = $1
-        """
-        return await self.db.fetch_one(query, user_id)
+        return await self.db.fetch_one(GET_BY_ID, user_id)
     
+    @all_shards
     async def get_by_firebase_uid(self, firebase_uid: str):
         """Get user by Firebase UID"""
-        query = """
-            SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
-                   created_at, updated_at, last_login
-            FROM users
-            WHERE firebase_uid = $1
-        """
-        return await self.db.fetch_one(query, firebase_uid)
+        return await self.db.fetch_one(GET_BY_FIREBASE_UID, firebase_uid)
     
+    async def locate_by_firebase_uid(self, firebase_uid: str):
+        """(shard name, user) for a Firebase UID, wherever the row lives; (None, None) if absent"""
+        return await self.db.locate(GET_BY_FIREBASE_UID, firebase_uid)
+    
+    async def locate_by_firebase_uids_or_emails(self, firebase_uids: List[str], emails: List[str]):
+        """Users matching any of firebase_uids or emails, grouped under the name of the shard holding them"""
+        return await self.db.fetch_by_shard(FIND_BY_FIREBASE_UIDS_OR_EMAILS, firebase_uids, emails)
+    
+    @all_shards
     async def get_by_email(self, email: str):
         """Get user by email"""
-        query = """
-            SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
-                   created_at, updated_at, last_login
-            FROM users
-            WHERE email = $1
-        """
-        return await self.db.fetch_one(query, email)
+        return await self.db.fetch_one(GET_BY_EMAIL, email)
     
     async def create(self, firebase_uid: str, email: str, display_name: Optional[str] = None):
-        """Create a new user"""
-        query = """
-            INSERT INTO users (firebase_uid, email, display_name)
-            VALUES ($1, $2, $3)
-            RETURNING id, firebase_uid, email, display_name, role, is_active, created_at
-        """
-        return await self.db.fetch_one(query, firebase_uid, email, display_name)
+        """Create a new user (the id derives from firebase_uid and picks the shard)"""
+        user_id = user_id_for_uid(firebase_uid)
+        with on_shard(user_id):
+            return await self.db.fetch_one(CREATE, user_id, firebase_uid, email, display_name)
     
+    @sharded("user_id")
     async def update(self, user_id: str, **kwargs):
         """Update user fields"""
         fields = []
@@ -73,25 +141,47 @@ class UserRepository:
             WHERE id = ${idx}
             RETURNING id, firebase_uid, email, display_name, role, is_active, updated_at
         """
-        return await self.db.fetch_one(query, *values)
+        user = await self.db.fetch_one(query, *values)
+        # After the write (and its commit): a miss in between would re-cache the old row
+        self.db.after_commit(lambda: user_cache.invalidate_user(user_id))
+        return user
+    
+    @all_shards
+    async def export_all(self):
+        """Stream every user as Records (see USER_LIST_COLUMNS), shard by shard (newest first within a shard)"""
+        return self.db.stream(EXPORT_USERS)
     
+    @replica_read
+    @all_shards
     async def get_all(self, limit: int = 100, offset: int = 0):
-        """Get all users with pagination"""
-        query = """
-            SELECT id, firebase_uid, email, display_name, role, is_active, is_banned,
-                   created_at, last_login
-            FROM users
-            ORDER BY created_at DESC
-            LIMIT $1 OFFSET $2
-        """
-        return await self.db.fetch_all(query, limit, offset)
+        """Get all users with pagination, as Records (see USER_LIST_COLUMNS)"""
+        if not self.db.sharded:
+            return await self.db.fetch_records(GET_ALL, limit, offset)
+        
+        # Each shard's first limit + offset rows cover the requested page
+        rows = await self.db.fetch_records(GET_ALL, limit + offset, 0)
+        rows.sort(key=lambda row: row['created_at'], reverse=True)
+        return rows[offset:offset + limit]
+    
+    @replica_read
+    @sharded("user_id")
+    async def get_profile(self, user_id: str):
+        """Get a user's public profile"""
+        return await self.db.fetch_one(GET_PROFILE, user_id)
+    
+    @sharded("user_id")
+    async def get_stats(self, user_id: str):
+        """Test, score and endorsement totals for a user (get_user_stats)"""
+        return await self.db.fetch_one(GET_STATS, user_id)
     
+    @sharded("user_id")
     async def ban_user(self, user_id: str):
         """Ban a user"""
-        query = "UPDATE users SET is_banned = TRUE WHERE id = $1"
-        await self.db.execute(query, user_id)
+        await self.db.execute(BAN_USER, user_id)
+        self.db.after_commit(lambda: user_cache.invalidate_user(user_id))
     
+    @sharded("user_id")
     async def delete(self, user_id: str):
         """Delete a user"""
-        query = "DELETE FROM users WHERE id = $1"
-        await self.db.execute(query, user_id)
+        await self.db.execute(DELETE, user_id)
+        self.db.after_commit(lambda: user_cache.invalidate_user(user_id))
@@ -1,23 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.core.security import require_admin, require_moderator, AuthUser
-from app.core.database import get_db, Database
-from app.repositories.user_repository import UserRepository
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Optional
+from datetime import datetime
+import base64
+from app.core.security import require_admin, require_moderator, AuthUser, log_activity
+from app.core.database import get_db, use_pool, Database
+from app.core.firebase import firebase_auth
+from app.core.queries import queries
+from app.core.rank_index import rank_index
+from app.core.slow_queries import slow_query_sampler
+from app.core.responses import RecordListResponse, RecordMapping, RecordStreamResponse
+from app.schemas.bulk_import import BulkImportRequest
+from app.services.import_service import BulkImportService
+from app.repositories.lifescore_repository import LifeScoreRepository, SCORE_LIST_COLUMNS
+from app.repositories.user_repository import UserRepository, USER_LIST_COLUMNS
 from app.core.logging import get_logger
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 logger = get_logger(__name__)
 
+ACTIVITY_LOG_COLUMNS = RecordMapping(
+    "id", "user_id", "email", "action", "resource_type", "resource_id",
+    "metadata", "ip_address", "created_at"
+)
+
 
 @router.get("/users")
+@use_pool("batch")
 async def get_all_users(
     limit: int = 100,
     offset: int = 0,
+    include_firebase: bool = False,
     current_user: AuthUser = Depends(require_moderator),
     db: Database = Depends(get_db)
 ):
-    """Get all users (moderator/admin only)"""
+    """
+    Get all users (moderator/admin only)
+    include_firebase adds Firebase account state, fetched in batched lookups.
+    """
     repo = UserRepository(db)
-    users = await repo.get_all(limit, offset)
+    rows = await repo.get_all(limit, offset)
+    
+    if not include_firebase or not rows:
+        return RecordListResponse(rows, USER_LIST_COLUMNS)
+    
+    users = USER_LIST_COLUMNS.render(rows)
+    firebase_users = await firebase_auth.get_users([u['firebase_uid'] for u in users])
+    for user in users:
+        record = firebase_users.get(user['firebase_uid'])
+        user['firebase'] = {
+            'email_verified': record.email_verified,
+            'disabled': record.disabled,
+            'last_sign_in': record.user_metadata.last_sign_in_timestamp,
+        } if record else None
+    
     return users
 
 
@@ -34,8 +69,7 @@ async def get_user_details(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    query = "SELECT * FROM get_user_stats($1)"
-    stats = await db.fetch_one(query, user_id)
+    stats = await repo.get_stats(user_id)
     
     return {
         "user": user,
@@ -44,27 +78,17 @@ async def get_user_details(
 
 
 @router.get("/scores")
+@use_pool("batch")
 async def get_all_scores(
     limit: int = 100,
     current_user: AuthUser = Depends(require_moderator),
     db: Database = Depends(get_db)
 ):
-    """Get all user scores (moderator/admin only)"""
-    query = """
-        SELECT u.id, u.email, u.display_name,
-               ls.composite_score as lifescore,
-               ls.cognitive_score,
-               ls.portfolio_score,
-               ls.endorsement_score,
-               ls.rank,
-               ls.created_at
-        FROM users u
-        LEFT JOIN latest_lifescores ls ON u.id = ls.user_id
-        ORDER BY ls.composite_score DESC NULLS LAST
-        LIMIT $1
-    """
-    scores = await db.fetch_all(query, limit)
-    return scores
+    """Get all user scores (moderator/admin only); rank comes from the rank index"""
+    scores = await LifeScoreRepository(db).get_all_scores(limit)
+    if rank_index.loaded:
+        scores = [rank_index.annotate(dict(row), 'lifescore') for row in scores]
+    return RecordListResponse(scores, SCORE_LIST_COLUMNS)
 
 
 @router.post("/users/{user_id}/ban")
@@ -103,21 +127,204 @@ async def delete_user(
     return {"message": "User deleted successfully"}
 
 
+@router.post("/import")
+@use_pool("batch")
+async def bulk_import(
+    data: BulkImportRequest,
+    request: Request,
+    current_user: AuthUser = Depends(require_admin),
+    db: Database = Depends(get_db)
+):
+    """
+    Bulk-load users, profiles, cognitive scores and LifeScore history (admin only)
+    Runs as one transaction per shard, each user on their own shard; rankings are recomputed once at the end.
+    """
+    service = BulkImportService(db)
+    result = await service.import_cohort(data)
+    
+    await log_activity(
+        db,
+        current_user.user_id,
+        "admin.bulk_import",
+        metadata=result,
+        request=request
+    )
+    
+    return result
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    current_user: AuthUser = Depends(require_moderator)
+):
+    """Execution counts and timings per named query (moderator/admin only)"""
+    return queries.stats()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    current_user: AuthUser = Depends(require_moderator)
+):
+    """Slow-query counts and sampled EXPLAIN (ANALYZE, BUFFERS) plans, newest first (moderator/admin only)"""
+    return slow_query_sampler.stats()
+
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(
+    current_user: AuthUser = Depends(require_admin)
+):
+    """Drop captured plans, e.g. after adding an index (admin only)"""
+    slow_query_sampler.clear()
+    return {"message": "Slow-query plans cleared"}
+
+
+def _encode_log_cursor(created_at: datetime, log_id) -> str:
+    """Opaque keyset cursor for the last row of an activity-log page"""
+    raw = f"{created_at.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_log_cursor(cursor: str):
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), log_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/activity-logs")
+@use_pool("batch")
 async def get_activity_logs(
     limit: int = 100,
-    offset: int = 0,
+    cursor: Optional[str] = None,
+    offset: Optional[int] = Query(None, ge=0, deprecated=True),
+    current_user: AuthUser = Depends(require_moderator),
+    db: Database = Depends(get_db)
+):
+    """
+    Get activity logs, newest first, as {logs, next_cursor} (moderator/admin only)
+    Pass the returned next_cursor to fetch the following page.
+    Deprecated: with offset (and no cursor) the old OFFSET paging and bare-list
+    response are kept for existing clients; deep offsets scan every skipped row.
+    """
+    limit = max(1, min(limit, 1000))
+    
+    if offset is not None and not cursor:
+        query = """
+            SELECT al.id, al.user_id, u.email, al.action, al.resource_type,
+                   al.resource_id, al.metadata, al.ip_address, al.created_at
+            FROM (
+                SELECT id, user_id, action, resource_type, resource_id,
+                       metadata, ip_address, created_at
+                FROM activity_logs
+                ORDER BY created_at DESC, id DESC
+                LIMIT $1 OFFSET $2
+            ) al
+            LEFT JOIN users u ON al.user_id = u.id
+            ORDER BY al.created_at DESC, al.id DESC
+        """
+        logs = await db.fetch_records(query, limit, offset)
+        return RecordListResponse(logs, ACTIVITY_LOG_COLUMNS, headers={"Deprecation": "true"})
+    
+    if cursor:
+        before_created_at, before_id = _decode_log_cursor(cursor)
+        # created_at <= $2 lets the planner prune newer partitions
+        query = """
+            SELECT al.id, al.user_id, u.email, al.action, al.resource_type,
+                   al.resource_id, al.metadata, al.ip_address, al.created_at
+            FROM (
+                SELECT id, user_id, action, resource_type, resource_id,
+                       metadata, ip_address, created_at
+                FROM activity_logs
+                WHERE created_at <= $2 AND (created_at, id) < ($2, $3::uuid)
+                ORDER BY created_at DESC, id DESC
+                LIMIT $1
+            ) al
+            LEFT JOIN users u ON al.user_id = u.id
+            ORDER BY al.created_at DESC, al.id DESC
+        """
+        logs = await db.fetch_records(query, limit, before_created_at, before_id)
+    else:
+        query = """
+            SELECT al.id, al.user_id, u.email, al.action, al.resource_type,
+                   al.resource_id, al.metadata, al.ip_address, al.created_at
+            FROM (
+                SELECT id, user_id, action, resource_type, resource_id,
+                       metadata, ip_address, created_at
+                FROM activity_logs
+                ORDER BY created_at DESC, id DESC
+                LIMIT $1
+            ) al
+            LEFT JOIN users u ON al.user_id = u.id
+            ORDER BY al.created_at DESC, al.id DESC
+        """
+        logs = await db.fetch_records(query, limit)
+    
+    next_cursor = None
+    if len(logs) == limit:
+        next_cursor = _encode_log_cursor(logs[-1]['created_at'], logs[-1]['id'])
+    
+    return RecordListResponse(
+        logs, ACTIVITY_LOG_COLUMNS, envelope="logs", extra={"next_cursor": next_cursor}
+    )
+
+
+ExportFormat = Query("ndjson", pattern="^(ndjson|csv)$")
+
+
+@router.get("/export/users")
+@use_pool("export")
+async def export_users(
+    format: str = ExportFormat,
     current_user: AuthUser = Depends(require_moderator),
     db: Database = Depends(get_db)
 ):
-    """Get activity logs (moderator/admin only)"""
+    """Stream every user as NDJSON or CSV, one shard after another (moderator/admin only)"""
+    return RecordStreamResponse(
+        await UserRepository(db).export_all(), USER_LIST_COLUMNS, format, filename="users"
+    )
+
+
+@router.get("/export/scores")
+@use_pool("export")
+async def export_scores(
+    format: str = ExportFormat,
+    current_user: AuthUser = Depends(require_moderator),
+    db: Database = Depends(get_db)
+):
+    """
+    Stream every user's latest scores as NDJSON or CSV, one shard after another
+    (moderator/admin only); rank comes from the rank index
+    """
+    records = await LifeScoreRepository(db).export_scores()
+    return RecordStreamResponse(
+        rank_index.annotate_stream(records, 'lifescore'),
+        SCORE_LIST_COLUMNS, format, filename="scores"
+    )
+
+
+@router.get("/export/activity-logs")
+@use_pool("export")
+async def export_activity_logs(
+    format: str = ExportFormat,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: AuthUser = Depends(require_moderator),
+    db: Database = Depends(get_db)
+):
+    """
+    Stream activity logs, newest first, as NDJSON or CSV (moderator/admin only)
+    since/until bound created_at so only the matching partitions are scanned.
+    """
     query = """
         SELECT al.id, al.user_id, u.email, al.action, al.resource_type,
                al.resource_id, al.metadata, al.ip_address, al.created_at
         FROM activity_logs al
         LEFT JOIN users u ON al.user_id = u.id
-        ORDER BY al.created_at DESC
-        LIMIT $1 OFFSET $2
+        WHERE ($1::timestamptz IS NULL OR al.created_at >= $1)
+          AND ($2::timestamptz IS NULL OR al.created_at < $2)
+        ORDER BY al.created_at DESC, al.id DESC
     """
-    logs = await db.fetch_all(query, limit, offset)
-    return logs
+    return RecordStreamResponse(
+        db.stream(query, since, until), ACTIVITY_LOG_COLUMNS, format, filename="activity-logs"
+    )
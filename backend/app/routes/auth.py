@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from ..core.security import get_current_user, AuthUser, log_activity
 from ..core.database import get_db, Database
+from ..repositories.user_repository import UserRepository
 from ..schemas.auth import UserResponse
 from ..core.logging import get_logger
 
@@ -15,12 +16,7 @@ async def get_current_user_info(
     request: Request = None
 ):
     """Get current authenticated user information"""
-    query = """
-        SELECT id, firebase_uid, email, display_name, role, is_active, created_at, last_login
-        FROM users
-        WHERE id = $1
-    """
-    user = await db.fetch_one(query, current_user.user_id)
+    user = await UserRepository(db).get_by_id(current_user.user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
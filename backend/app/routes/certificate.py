@@ -27,12 +27,14 @@ async def create_certificate(
             current_user.user_id,
             "certificate.create",
             "certificate",
-            str(certificate['id']),
+            certificate['id'],
             {"title": certificate['title']},
             request
         )
         
         return certificate
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Certificate creation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -90,6 +92,8 @@ async def update_certificate(
         )
         
         return certificate
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Certificate update failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -119,6 +123,8 @@ async def delete_certificate(
         )
         
         return {"message": "Certificate deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Certificate deletion failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,33 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..core.database import get_db
-from ..core.security import get_current_user
-from ..schemas.cognitive import CognitiveTestCreate, CognitiveTestSubmit, CognitiveTestResponse
-from ..services.cognitive_service import CognitiveService
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any
+from ..core.security import get_current_user, AuthUser, log_activity
+from ..core.database import get_db, get_transactional_unit_of_work, Database, UnitOfWork
+from ..services.cognitive_service import CognitiveService
+from ..core.logging import get_logger
+
+router = APIRouter(prefix="/cognitive", tags=["Cognitive"])
+logger = get_logger(__name__)
+
+
+class TestStart(BaseModel):
+    test_type: str = "general"
+
 
 class TestSubmission(BaseModel):
     test_id: str
     answers: Dict[str, Any]
     time_taken_seconds: int
 
-router = APIRouter()
 
-@router.post("/start", response_model=dict)
+@router.post("/start")
 async def start_test(
-    test_data: dict,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    test_data: TestStart,
+    current_user: AuthUser = Depends(get_current_user),
+    db: Database = Depends(get_db)
 ):
+    """Start a new cognitive test"""
     service = CognitiveService(db)
-    return service.start_test(current_user["uid"], test_data)
+    test = await service.start_test(current_user.user_id, test_data.test_type)
+    return {"test_id": test['id'], **test}
+
 
-@router.post("/submit", response_model=dict)
+@router.post("/submit")
 async def submit_test(
     test_data: TestSubmission,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthUser = Depends(get_current_user),
+    db: UnitOfWork = Depends(get_transactional_unit_of_work),
+    request: Request = None
 ):
+    """Submit test answers; completing the test and storing the score is atomic"""
     service = CognitiveService(db)
-    return service.submit_test(current_user["uid"], test_data.dict())
+    
+    try:
+        score = await service.submit_test(
+            test_data.test_id,
+            current_user.user_id,
+            test_data.answers,
+            test_data.time_taken_seconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await log_activity(
+        db,
+        current_user.user_id,
+        "cognitive.submit",
+        "cognitive_test",
+        test_data.test_id,
+        {"score": float(score['composite_score'])},
+        request
+    )
+    
+    return score
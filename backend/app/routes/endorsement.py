@@ -27,12 +27,14 @@ async def create_endorsement(
             current_user.user_id,
             "endorsement.create",
             "endorsement",
-            str(endorsement['id']),
+            endorsement['id'],
             {"skill": endorsement['skill']},
             request
         )
         
         return endorsement
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Endorsement creation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -91,6 +93,8 @@ async def update_endorsement(
         )
         
         return endorsement
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Endorsement update failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -120,6 +124,8 @@ async def delete_endorsement(
         )
         
         return {"message": "Endorsement deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Endorsement deletion failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
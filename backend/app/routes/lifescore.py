@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from app.core.security import get_current_user, AuthUser, log_activity
-from ..core.database import get_db, Database
+from ..core.database import get_db, get_transactional_unit_of_work, use_pool, Database, UnitOfWork
+from ..core.responses import RecordListResponse
+from ..repositories.lifescore_repository import LEADERBOARD_COLUMNS
 from ..services.lifescore_service import LifeScoreService
 from ..schemas.lifescore import LifeScoreResponse, LifeScoreHistoryResponse
 from ..core.logging import get_logger
@@ -12,7 +14,7 @@ logger = get_logger(__name__)
 @router.post("/calculate", response_model=LifeScoreResponse)
 async def calculate_lifescore(
     current_user: AuthUser = Depends(get_current_user),
-    db: Database = Depends(get_db),
+    db: UnitOfWork = Depends(get_transactional_unit_of_work),
     request: Request = None
 ):
     """Calculate composite LifeScore for current user"""
@@ -26,12 +28,14 @@ async def calculate_lifescore(
             current_user.user_id,
             "lifescore.calculate",
             "lifescore",
-            str(lifescore['id']),
+            lifescore['id'],
             {"score": float(lifescore['composite_score'])},
             request
         )
         
         return lifescore
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"LifeScore calculation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -65,6 +69,7 @@ async def get_lifescore_history(
 
 
 @router.get("/leaderboard")
+@use_pool("public")
 async def get_leaderboard(
     limit: int = 100,
     db: Database = Depends(get_db)
@@ -72,4 +77,4 @@ async def get_leaderboard(
     """Get global LifeScore leaderboard (public)"""
     service = LifeScoreService(db)
     leaderboard = await service.get_leaderboard(limit)
-    return leaderboard
+    return RecordListResponse(leaderboard, LEADERBOARD_COLUMNS)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from ..core.security import get_current_user, AuthUser, log_activity
-from ..core.database import get_db, Database
+from ..core.database import get_db, get_transactional_unit_of_work, Database, UnitOfWork
+from ..repositories.portfolio_repository import PortfolioRepository
 from ..services.portfolio_service import PortfolioService
 from ..schemas.portfolio import GitHubAnalyzeRequest, PortfolioAnalysisResponse
 from ..core.logging import get_logger
@@ -13,7 +14,7 @@ logger = get_logger(__name__)
 async def analyze_github_profile(
     request_data: GitHubAnalyzeRequest,
     current_user: AuthUser = Depends(get_current_user),
-    db: Database = Depends(get_db),
+    db: UnitOfWork = Depends(get_transactional_unit_of_work),
     request: Request = None
 ):
     """Analyze GitHub profile and calculate portfolio score"""
@@ -27,12 +28,14 @@ async def analyze_github_profile(
             current_user.user_id,
             "portfolio.analyze_github",
             "portfolio_score",
-            str(result['score']['id']),
+            result['score']['id'],
             {"github_username": request_data.github_username},
             request
         )
         
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"GitHub analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to analyze GitHub profile: {str(e)}")
@@ -44,13 +47,7 @@ async def get_portfolio_score(
     db: Database = Depends(get_db)
 ):
     """Get latest portfolio score for current user"""
-    query = """
-        SELECT id, user_id, repo_quality_score, activity_score, impact_score,
-               composite_score, score_breakdown, created_at
-        FROM latest_portfolio_scores
-        WHERE user_id = $1
-    """
-    score = await db.fetch_one(query, current_user.user_id)
+    score = await PortfolioRepository(db).get_latest_score_details(current_user.user_id)
     
     if not score:
         raise HTTPException(status_code=404, detail="No portfolio score found")
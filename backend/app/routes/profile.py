@@ -100,13 +100,7 @@ async def get_user_profile(
     request: Request = None
 ):
     """Get another user's public profile"""
-    query = """
-        SELECT id, user_id, bio, avatar_url, github_username, linkedin_url,
-               website_url, location, skills, created_at, updated_at
-        FROM user_profiles
-        WHERE user_id = $1
-    """
-    profile = await db.fetch_one(query, user_id)
+    profile = await UserRepository(db).get_profile(user_id)
 
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+
+class ImportUser(BaseModel):
+    firebase_uid: str
+    email: str
+    display_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
+class ImportProfile(BaseModel):
+    firebase_uid: str
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+    github_username: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    website_url: Optional[str] = None
+    location: Optional[str] = None
+    skills: Optional[List[str]] = None
+
+
+class ImportCognitiveScore(BaseModel):
+    firebase_uid: str
+    test_type: str = "imported"
+    accuracy_score: float = Field(ge=0, le=100)
+    speed_score: float = Field(ge=0, le=100)
+    difficulty_score: float = Field(ge=0, le=100)
+    composite_score: float = Field(ge=0, le=100)
+    percentile: Optional[float] = None
+    score_breakdown: Optional[Dict[str, Any]] = None
+    taken_at: Optional[datetime] = None
+
+
+class ImportLifeScore(BaseModel):
+    firebase_uid: str
+    cognitive_score: Optional[float] = Field(default=None, ge=0, le=100)
+    portfolio_score: Optional[float] = Field(default=None, ge=0, le=100)
+    endorsement_score: Optional[float] = Field(default=None, ge=0, le=100)
+    composite_score: float = Field(ge=0, le=100)
+    score_breakdown: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+
+class BulkImportRequest(BaseModel):
+    users: List[ImportUser] = []
+    profiles: List[ImportProfile] = []
+    cognitive_scores: List[ImportCognitiveScore] = []
+    lifescores: List[ImportLifeScore] = []
@@ -2,6 +2,7 @@ from typing import Optional
 from ..repositories.certificate_repository import CertificateRepository
 from ..repositories.lifescore_repository import LifeScoreRepository
 from ..core.database import Database
+from ..core.rank_index import rank_index
 from ..core.logging import get_logger
 from ..config.settings import settings
 
@@ -19,7 +20,7 @@ class CertificateService:
         """Create a certificate for a user based on their latest LifeScore"""
         logger.info(f"Creating certificate for user: {user_id}")
         
-        lifescore = await self.lifescore_repo.get_latest_score(user_id)
+        lifescore = rank_index.annotate(await self.lifescore_repo.get_latest_score(user_id))
         
         if not lifescore:
             raise ValueError("No LifeScore found for user")
@@ -23,7 +23,7 @@ class CognitiveService:
         if not test:
             raise ValueError("Test not found")
         
-        if str(test['user_id']) != user_id:
+        if test['user_id'] != user_id:
             raise ValueError("Unauthorized")
         
         if test['status'] == 'completed':
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from typing import Dict, Any, List
+from app.core.database import Database, use_shard, user_id_for_uid
+from app.core.cache import user_cache
+from app.core.rank_index import rank_index
+from app.repositories.import_repository import BulkImportRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.bulk_import import BulkImportRequest
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class BulkImportService:
+    """Service for importing cohorts of users and historical scores"""
+
+    # firebase_uids listed in the result (and activity log) when emails conflict
+    MAX_REPORTED_CONFLICTS = 100
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def import_cohort(self, data: BulkImportRequest) -> Dict[str, Any]:
+        """
+        Load users, profiles, cognitive scores and LifeScore history, one transaction per shard.
+        Rows are binary-COPYed into staging tables and merged set-wise; reloading the
+        rank index at the end recomputes rankings once. Rows whose firebase_uid matches no user are skipped, and
+        so are new users whose email belongs to another user or to an earlier row of the batch.
+        """
+        staged = {
+            "import_users": [
+                {**row.model_dump(), "id": user_id_for_uid(row.firebase_uid)} for row in data.users
+            ],
+            "import_profiles": [row.model_dump() for row in data.profiles],
+            "import_cognitive_scores": [row.model_dump() for row in data.cognitive_scores],
+            "import_lifescores": [row.model_dump() for row in data.lifescores],
+        }
+
+        # Existing users stay where their row lives; new users go to their hash shard
+        uids = list({row["firebase_uid"] for rows in staged.values() for row in rows})
+        emails = list({row["email"] for row in staged["import_users"]})
+        existing = await UserRepository(self.db).locate_by_firebase_uids_or_emails(uids, emails)
+        placement = {}
+        email_owners = {}
+        for shard, users in existing.items():
+            for user in users:
+                placement[user["firebase_uid"]] = shard
+                email_owners[user["email"]] = user["firebase_uid"]
+
+        staged["import_users"], conflicts = self._drop_email_conflicts(
+            staged["import_users"], placement, email_owners
+        )
+
+        by_shard: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: {table: [] for table in staged})
+        for table, rows in staged.items():
+            for row in rows:
+                uid = row["firebase_uid"]
+                shard = placement.get(uid) or self.db.shard_router.shard_for(user_id_for_uid(uid))
+                by_shard[shard][table].append(row)
+
+        totals = {
+            "users": {"created": 0, "updated": 0},
+            "profiles": {"created": 0, "updated": 0},
+            "cognitive_scores": {"created": 0},
+            "lifescores": {"created": 0},
+        }
+        for shard, tables in by_shard.items():
+            with use_shard(shard):
+                counts = await self._import_shard(tables)
+            for kind, values in counts.items():
+                for key, value in values.items():
+                    totals[kind][key] += value
+
+        if totals["users"]["updated"]:
+            user_cache.clear()
+        if totals["lifescores"]["created"]:
+            await rank_index.load()
+
+        result = {
+            "users": {
+                **totals["users"],
+                "staged": len(data.users),
+                "skipped_email_conflicts": len(conflicts),
+                "email_conflicts": conflicts[:self.MAX_REPORTED_CONFLICTS],
+            },
+            "profiles": {**totals["profiles"], "staged": len(data.profiles)},
+            "cognitive_scores": {**totals["cognitive_scores"], "staged": len(data.cognitive_scores)},
+            "lifescores": {**totals["lifescores"], "staged": len(data.lifescores)},
+        }
+        logger.info(f"Bulk import finished: {result}")
+        return result
+
+    @staticmethod
+    def _drop_email_conflicts(rows: List[dict], placement: Dict[str, str], email_owners: Dict[str, str]):
+        """
+        Split staged users into rows to merge and the firebase_uids of new users whose email
+        is taken (UNIQUE(email) would abort the whole merge). Existing users are always kept:
+        the merge never changes their email.
+        """
+        email_owners = dict(email_owners)
+        kept, conflicts = [], []
+        for row in rows:
+            uid, email = row["firebase_uid"], row["email"]
+            if uid not in placement:
+                owner = email_owners.setdefault(email, uid)
+                if owner != uid:
+                    conflicts.append(uid)
+                    continue
+            kept.append(row)
+        return kept, conflicts
+
+    async def _import_shard(self, tables: Dict[str, List[dict]]) -> Dict[str, Dict[str, int]]:
+        """Stage and merge one shard's rows in a single transaction"""
+        async with self.db.unit_of_work(transactional=True) as uow:
+            repo = BulkImportRepository(uow)
+            await repo.create_staging_tables()
+            for table, rows in tables.items():
+                await repo.stage(table, rows)
+
+            counts = {
+                "users": await repo.merge_users(),
+                "profiles": await repo.merge_profiles(),
+                "cognitive_scores": await repo.merge_cognitive_scores(),
+                "lifescores": await repo.merge_lifescores(),
+            }
+
+        return counts
@@ -4,6 +4,7 @@ from app.repositories.cognitive_repository import CognitiveRepository
 from app.repositories.portfolio_repository import PortfolioRepository
 from app.repositories.endorsement_repository import EndorsementRepository
 from app.core.database import Database
+from app.core.rank_index import rank_index
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -13,6 +14,7 @@ class LifeScoreService:
     """Service for LifeScore calculation"""
     
     def __init__(self, db: Database):
+        self.db = db
         self.lifescore_repo = LifeScoreRepository(db)
         self.cognitive_repo = CognitiveRepository(db)
         self.portfolio_repo = PortfolioRepository(db)
@@ -66,13 +68,21 @@ class LifeScoreService:
             score_breakdown=score_breakdown
         )
         
-        await self.lifescore_repo.update_rankings()
+        # O(log n) in the rank index plus one row write, instead of re-ranking every user.
+        # The index itself changes only once the score is committed.
+        score = lifescore['composite_score']
+        if rank_index.loaded:
+            lifescore['rank'], lifescore['percentile'] = rank_index.position_if(user_id, score)
+            await self.lifescore_repo.set_position(
+                user_id, lifescore['id'], lifescore['rank'], lifescore['percentile']
+            )
+        self.db.after_commit(lambda: rank_index.update(user_id, score))
         
         return lifescore
     
     async def get_lifescore(self, user_id: str):
         """Get latest LifeScore for a user"""
-        return await self.lifescore_repo.get_latest_score(user_id)
+        return rank_index.annotate(await self.lifescore_repo.get_latest_score(user_id))
     
     async def get_history(self, user_id: str, limit: int = 10):
         """Get LifeScore history"""
@@ -118,4 +128,7 @@ class LifeScoreService:
     
     async def get_leaderboard(self, limit: int = 100):
         """Get global leaderboard"""
-        return await self.lifescore_repo.get_leaderboard(limit)
+        rows = await self.lifescore_repo.get_leaderboard(limit)
+        if not rank_index.loaded:
+            return rows
+        return [rank_index.annotate(dict(row), 'lifescore') for row in rows]
@@ -4,6 +4,7 @@ from datetime import datetime
 from ..repositories.portfolio_repository import PortfolioRepository
 from ..core.database import Database
 from ..core.logging import get_logger
+from ..core import deadline
 from ..config.settings import settings
 
 logger = get_logger(__name__)
@@ -27,23 +28,22 @@ class PortfolioService:
             user_data = await self._fetch_github_user(client, github_username, headers)
             repos_data = await self._fetch_github_repos(client, github_username, headers)
             
-            repos = []
-            for repo in repos_data:
-                if not repo.get('fork', False) or repo.get('stargazers_count', 0) > 5:
-                    repo_record = await self.repo.create_repo(
-                        user_id=user_id,
-                        repo_name=repo['name'],
-                        repo_url=repo['html_url'],
-                        description=repo.get('description'),
-                        stars=repo.get('stargazers_count', 0),
-                        forks=repo.get('forks_count', 0),
-                        primary_language=repo.get('language'),
-                        tech_stack=[repo.get('language')] if repo.get('language') else [],
-                        last_commit_date=self._parse_date(repo.get('pushed_at')),
-                        created_date=self._parse_date(repo.get('created_at')),
-                        is_fork=repo.get('fork', False)
-                    )
-                    repos.append(repo_record)
+            repos = await self.repo.upsert_repos(user_id, [
+                {
+                    'repo_name': repo['name'],
+                    'repo_url': repo['html_url'],
+                    'description': repo.get('description'),
+                    'stars': repo.get('stargazers_count', 0),
+                    'forks': repo.get('forks_count', 0),
+                    'primary_language': repo.get('language'),
+                    'tech_stack': [repo.get('language')] if repo.get('language') else [],
+                    'last_commit_date': self._parse_date(repo.get('pushed_at')),
+                    'created_date': self._parse_date(repo.get('created_at')),
+                    'is_fork': repo.get('fork', False)
+                }
+                for repo in repos_data
+                if not repo.get('fork', False) or repo.get('stargazers_count', 0) > 5
+            ])
             
             languages = self._extract_languages(repos_data)
             
@@ -76,9 +76,15 @@ class PortfolioService:
     async def _fetch_github_user(self, client: httpx.AsyncClient, username: str, headers: dict):
         """Fetch GitHub user data"""
         try:
-            response = await client.get(f"https://api.github.com/users/{username}", headers=headers)
+            response = await client.get(
+                f"https://api.github.com/users/{username}",
+                headers=headers,
+                timeout=deadline.budget(settings.HTTP_TIMEOUT_SECONDS)
+            )
             response.raise_for_status()
             return response.json()
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Failed to fetch GitHub user: {e}")
             return {}
@@ -89,10 +95,13 @@ class PortfolioService:
             response = await client.get(
                 f"https://api.github.com/users/{username}/repos",
                 headers=headers,
-                params={'per_page': 100, 'sort': 'updated'}
+                params={'per_page': 100, 'sort': 'updated'},
+                timeout=deadline.budget(settings.HTTP_TIMEOUT_SECONDS)
             )
             response.raise_for_status()
             return response.json()
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Failed to fetch GitHub repos: {e}")
             return []
@@ -0,0 +1,63 @@
+-- Convert an existing unpartitioned activity_logs table to monthly partitions.
+-- Run once against databases created from an older supabase.sql, after deploying
+-- the partition functions from supabase.sql.
+
+BEGIN;
+
+ALTER TABLE activity_logs RENAME TO activity_logs_legacy;
+ALTER INDEX IF EXISTS activity_logs_pkey RENAME TO activity_logs_legacy_pkey;
+DROP INDEX IF EXISTS idx_activity_logs_user_id;
+DROP INDEX IF EXISTS idx_activity_logs_action;
+DROP INDEX IF EXISTS idx_activity_logs_created_at;
+DROP INDEX IF EXISTS idx_activity_logs_resource;
+
+CREATE TABLE activity_logs (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(100),
+    resource_id UUID,
+    metadata JSONB,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (created_at, id)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT;
+
+CREATE INDEX idx_activity_logs_user_id ON activity_logs(user_id);
+CREATE INDEX idx_activity_logs_resource ON activity_logs(resource_type, resource_id);
+
+-- Create partitions covering the legacy data before copying it in
+DO $$
+DECLARE
+    v_month DATE;
+BEGIN
+    FOR v_month IN
+        SELECT DISTINCT date_trunc('month', created_at)::DATE
+        FROM activity_logs_legacy
+        WHERE created_at IS NOT NULL
+    LOOP
+        IF to_regclass('activity_logs_' || to_char(v_month, 'YYYY_MM')) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+                'activity_logs_' || to_char(v_month, 'YYYY_MM'),
+                v_month, (v_month + INTERVAL '1 month')::DATE
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
+
+SELECT create_activity_log_partitions(3);
+
+INSERT INTO activity_logs
+    (id, user_id, action, resource_type, resource_id, metadata, ip_address, user_agent, created_at)
+SELECT id, user_id, action, resource_type, resource_id, metadata, ip_address, user_agent,
+       COALESCE(created_at, NOW())
+FROM activity_logs_legacy;
+
+DROP TABLE activity_logs_legacy;
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- Add the (user_id, repo_name) unique constraint that the GitHub repo upserts
+-- (ON CONFLICT (user_id, repo_name)) rely on. Keeps the most recently updated
+-- row when a user already has duplicates.
+
+BEGIN;
+
+DELETE FROM github_repos g
+USING github_repos newer
+WHERE g.user_id = newer.user_id
+  AND g.repo_name = newer.repo_name
+  AND (g.updated_at, g.id) < (newer.updated_at, newer.id);
+
+ALTER TABLE github_repos
+    ADD CONSTRAINT github_repos_user_id_repo_name_key UNIQUE (user_id, repo_name);
+
+COMMIT;
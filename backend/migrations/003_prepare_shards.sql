@@ -0,0 +1,10 @@
+-- Run on every database listed in DATABASE_URL / DATABASE_SHARD_URLS before enabling shards.
+-- An endorsement lives on the endorsed user's shard, and activity logs stay on shard-0,
+-- so these references can point at users on another shard.
+
+BEGIN;
+
+ALTER TABLE endorsements DROP CONSTRAINT IF EXISTS endorsements_endorser_id_fkey;
+ALTER TABLE activity_logs DROP CONSTRAINT IF EXISTS activity_logs_user_id_fkey;
+
+COMMIT;
@@ -139,7 +139,8 @@ CREATE TABLE github_repos (
     created_date TIMESTAMP WITH TIME ZONE,
     is_fork BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(user_id, repo_name)
 );
 
 CREATE INDEX idx_github_repos_user_id ON github_repos(user_id);
@@ -251,8 +252,10 @@ CREATE INDEX idx_certificates_issued_at ON certificates(issued_at DESC);
 -- ============================================
 -- ACTIVITY LOGS TABLE
 -- ============================================
+-- Partitioned by month on created_at; the primary key leads with created_at so
+-- admin browsing can walk it backwards with a keyset cursor.
 CREATE TABLE activity_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     user_id UUID REFERENCES users(id) ON DELETE SET NULL,
     action VARCHAR(100) NOT NULL,
     resource_type VARCHAR(100),
@@ -260,14 +263,64 @@ CREATE TABLE activity_logs (
     metadata JSONB,
     ip_address INET,
     user_agent TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (created_at, id)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT;
 
 CREATE INDEX idx_activity_logs_user_id ON activity_logs(user_id);
-CREATE INDEX idx_activity_logs_action ON activity_logs(action);
-CREATE INDEX idx_activity_logs_created_at ON activity_logs(created_at DESC);
 CREATE INDEX idx_activity_logs_resource ON activity_logs(resource_type, resource_id);
 
+-- Create monthly partitions from the current month up to p_months_ahead months ahead
+CREATE OR REPLACE FUNCTION create_activity_log_partitions(p_months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    v_month DATE := date_trunc('month', NOW())::DATE;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        v_name := 'activity_logs_' || to_char(v_month, 'YYYY_MM');
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, (v_month + INTERVAL '1 month')::DATE
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::DATE;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop whole monthly partitions older than p_retain_months
+CREATE OR REPLACE FUNCTION drop_activity_log_partitions(p_retain_months INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cutoff DATE := (date_trunc('month', NOW()) - make_interval(months => p_retain_months))::DATE;
+    v_partition RECORD;
+    v_dropped INTEGER := 0;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'activity_logs'::regclass
+          AND c.relname ~ '^activity_logs_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF to_date(right(v_partition.relname, 7), 'YYYY_MM') < v_cutoff THEN
+            EXECUTE format('DROP TABLE %I', v_partition.relname);
+            v_dropped := v_dropped + 1;
+        END IF;
+    END LOOP;
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_activity_log_partitions(3);
+
 -- ============================================
 -- TRIGGERS FOR UPDATED_AT
 -- ============================================
@@ -0,0 +1,96 @@
+import os
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import asyncpg
+import pytest
+
+from app.config.settings import settings
+from app.core.database import Database, ShardRouter
+from fakes import FakePool
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# supabase.sql is the current schema; later migrations that still apply to a fresh database
+SCHEMA_FILES = [BACKEND_DIR / "supabase.sql", BACKEND_DIR / "migrations" / "003_prepare_shards.sql"]
+
+
+@pytest.fixture
+def make_db(monkeypatch):
+    """Build a Database over fake shard pools: make_db({"shard-0": handler, "shard-1": handler})"""
+    # Fake connections hold no prepared statements; run named queries as plain SQL
+    monkeypatch.setattr(settings, "DB_POOLER_MODE", True)
+
+    def build(handlers: dict) -> Database:
+        db = Database()
+        pools = {name: FakePool(name, handler) for name, handler in handlers.items()}
+        db.pool = pools.pop("shard-0")
+        db.shards = pools
+        db.shard_router = ShardRouter(["shard-0", *pools])
+        return db
+
+    return build
+
+
+def _with_database(url: str, name: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path=f"/{name}"))
+
+
+async def _load_schema(dsn: str):
+    conn = await asyncpg.connect(dsn)
+    try:
+        schema = "\n".join(path.read_text() for path in SCHEMA_FILES)
+        try:
+            await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+        except asyncpg.FeatureNotSupportedError:
+            # Servers built without contrib: uuid_generate_v4 is all the schema uses from it
+            await conn.execute(
+                "CREATE FUNCTION uuid_generate_v4() RETURNS uuid LANGUAGE sql AS 'SELECT gen_random_uuid()'"
+            )
+            schema = schema.replace('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";', "")
+        await conn.execute(schema)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture
+def pg_database(monkeypatch):
+    """
+    Connect a Database to fresh, schema-loaded Postgres databases created on TEST_DATABASE_URL,
+    one per shard: `async with pg_database(shards=2) as db`. Skipped when TEST_DATABASE_URL is unset.
+    """
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_WORKLOAD_POOLS", {})
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", [])
+
+    @asynccontextmanager
+    async def create(shards: int = 1):
+        names = [f"lifescore_test_{uuid.uuid4().hex[:12]}" for _ in range(shards)]
+        admin = await asyncpg.connect(url)
+        try:
+            for name in names:
+                await admin.execute(f'CREATE DATABASE "{name}"')
+            dsns = [_with_database(url, name) for name in names]
+            for dsn in dsns:
+                await _load_schema(dsn)
+
+            monkeypatch.setattr(settings, "DATABASE_URL", dsns[0])
+            monkeypatch.setattr(settings, "DATABASE_SHARD_URLS", dsns[1:])
+            db = Database()
+            await db.connect()
+            try:
+                yield db
+            finally:
+                await db.disconnect()
+        finally:
+            for name in names:
+                await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+            await admin.close()
+
+    return create
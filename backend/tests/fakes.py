@@ -0,0 +1,92 @@
+"""Fake asyncpg pools standing in for shard databases"""
+from typing import Callable, List
+
+from app.core.database import Database, user_id_for_uid
+
+# handler(sql, args) -> list of row dicts the fake database returns for a query
+Handler = Callable[[str, tuple], List[dict]]
+
+
+class FakeConnection:
+    """Answers asyncpg connection calls from its pool's handler and records every query"""
+
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+
+    async def fetch(self, sql, *args, timeout=None):
+        self.pool.queries.append((sql, args))
+        return self.pool.handler(sql, args)
+
+    async def fetchrow(self, sql, *args, timeout=None):
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql, *args, timeout=None):
+        row = await self.fetchrow(sql, *args)
+        return next(iter(row.values())) if row else None
+
+    async def execute(self, sql, *args, timeout=None):
+        await self.fetch(sql, *args)
+        return f"EXECUTE {self.pool.name}"
+
+    def transaction(self, **options):
+        return FakeTransaction()
+
+    async def cursor(self, sql, *args, prefetch=None):
+        for row in await self.fetch(sql, *args):
+            yield row
+
+
+class FakeTransaction:
+    """No-op transaction, used explicitly (UnitOfWork) or as a context manager (streams)"""
+
+    async def start(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    """Stand-in for an asyncpg pool of one shard"""
+
+    def __init__(self, name: str, handler: Handler = lambda sql, args: []):
+        self.name = name
+        self.handler = handler
+        self.queries = []
+
+    async def acquire(self, timeout=None):
+        return FakeConnection(self)
+
+    async def release(self, connection):
+        pass
+
+    def get_idle_size(self):
+        return 0
+
+    def get_size(self):
+        return 0
+
+
+def pool_hits(db: Database) -> dict:
+    """Number of queries each shard received"""
+    pools = {"shard-0": db.pool, **db.shards}
+    return {name: len(pool.queries) for name, pool in pools.items()}
+
+
+def uid_on_shard(db: Database, shard: str, prefix: str = "uid") -> str:
+    """A firebase_uid whose derived users.id hashes to the given shard"""
+    for index in range(10_000):
+        uid = f"{prefix}-{index}"
+        if db.shard_router.shard_for(user_id_for_uid(uid)) == shard:
+            return uid
+    raise AssertionError(f"no uid hashes to {shard}")
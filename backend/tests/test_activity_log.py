@@ -0,0 +1,70 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.config.settings import settings
+from app.core.activity_log import ActivityLogSink
+
+
+def test_stop_writes_the_batch_being_gathered(monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_SPILL_PATH", "")
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_FLUSH_SECONDS", 30.0)
+    written = []
+
+    async def scenario():
+        sink = ActivityLogSink(db=None)
+
+        async def write(batch):
+            await asyncio.sleep(0.01)
+            written.extend(batch)
+            return True
+
+        sink._write = write
+        sink.start()
+        for i in range(3):
+            sink.submit(None, f"action-{i}")
+        await asyncio.sleep(0.05)
+        # The task holds those rows in a batch, waiting out the flush interval
+        sink.submit(None, "action-3")
+        start = time.monotonic()
+        await sink.stop()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(scenario())
+    assert [row[1] for row in written] == ["action-0", "action-1", "action-2", "action-3"]
+    assert elapsed < 1
+
+
+def test_rows_are_copied_and_spills_replayed(pg_database, monkeypatch, tmp_path):
+    spill_path = tmp_path / "spill.ndjson"
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_SPILL_PATH", str(spill_path))
+    resource_id = str(uuid.uuid4())
+
+    async def scenario():
+        async with pg_database() as db:
+            sink = ActivityLogSink(db)
+            # Spilled by an earlier run that could not reach the database
+            sink._spill([
+                (None, "spilled", None, None, {"attempt": 1}, "10.0.0.1", "pytest", datetime.now(timezone.utc))
+            ])
+
+            sink.start()
+            sink.submit(None, "viewed", "certificate", resource_id, {"source": "test"}, "127.0.0.1", "pytest")
+            sink.submit(None, "bad-id", "certificate", "not-a-uuid", None, "not-an-ip", None)
+            await sink.stop()
+
+            rows = await db.fetch_all(
+                "SELECT action, resource_id, metadata, host(ip_address) AS ip FROM activity_logs ORDER BY action"
+            )
+            return sink.stats(), rows
+
+    stats, rows = asyncio.run(scenario())
+    assert stats["replayed"] == 1
+    assert stats["written"] == 3
+    assert list(tmp_path.iterdir()) == []
+    assert rows == [
+        {"action": "bad-id", "resource_id": None, "metadata": {"resource_id": "not-a-uuid"}, "ip": None},
+        {"action": "spilled", "resource_id": None, "metadata": {"attempt": 1}, "ip": "10.0.0.1"},
+        {"action": "viewed", "resource_id": resource_id, "metadata": {"source": "test"}, "ip": "127.0.0.1"},
+    ]
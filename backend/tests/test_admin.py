@@ -0,0 +1,36 @@
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+
+from app.routes.admin import get_activity_logs
+
+
+def log_rows(sql, args):
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [{"id": f"log-{i}", "user_id": None, "email": None, "action": "login", "resource_type": None,
+             "resource_id": None, "metadata": None, "ip_address": None, "created_at": created_at}
+            for i in range(args[0])]
+
+
+def test_activity_logs_page_by_cursor(make_db):
+    db = make_db({"shard-0": log_rows})
+
+    first = asyncio.run(get_activity_logs(limit=2, cursor=None, offset=None, current_user=None, db=db))
+    body = orjson.loads(first.body)
+    assert [log["id"] for log in body["logs"]] == ["log-0", "log-1"]
+
+    asyncio.run(get_activity_logs(limit=2, cursor=body["next_cursor"], offset=None, current_user=None, db=db))
+    sql, args = db.pool.queries[-1]
+    assert "(created_at, id) <" in sql and args[2] == "log-1"
+
+
+def test_activity_logs_offset_keeps_the_deprecated_list_response(make_db):
+    db = make_db({"shard-0": log_rows})
+
+    response = asyncio.run(get_activity_logs(limit=2, cursor=None, offset=4, current_user=None, db=db))
+
+    assert [log["id"] for log in orjson.loads(response.body)] == ["log-0", "log-1"]
+    assert response.headers["Deprecation"] == "true"
+    sql, args = db.pool.queries[-1]
+    assert "OFFSET $2" in sql and args == (2, 4)
@@ -0,0 +1,72 @@
+import asyncio
+
+from app.config.settings import settings
+from app.core.admission import AdmissionClass, AdmissionControlMiddleware, admission_limits
+
+
+def test_limits_are_sized_from_the_pools(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+    monkeypatch.setattr(settings, "DB_WORKLOAD_POOLS", {"public": 5, "batch": 3, "export": 2})
+    monkeypatch.setattr(settings, "ADMISSION_REQUESTS_PER_CONNECTION", 2)
+    monkeypatch.setattr(settings, "ADMISSION_LIMITS", {})
+    assert admission_limits() == {"read": 14, "write": 6, "public": 10, "heavy": 3, "export": 2}
+
+    monkeypatch.setattr(settings, "DB_WORKLOAD_POOLS", {})
+    monkeypatch.setattr(settings, "ADMISSION_LIMITS", {"heavy": 2})
+    assert admission_limits() == {"read": 14, "write": 6, "public": 20, "heavy": 2, "export": 1}
+
+
+def test_class_rejects_when_the_queue_is_full_or_the_wait_runs_out():
+    async def scenario():
+        admission = AdmissionClass("test", limit=1, queue_size=1)
+        assert await admission.acquire(max_wait=1)
+
+        waiter = asyncio.create_task(admission.acquire(max_wait=0.05))
+        await asyncio.sleep(0)
+        # One request already waits: the queue is full
+        assert not await admission.acquire(max_wait=1)
+        assert not await waiter
+
+        admission.release()
+        # Both rejections gave their place back: the slot is free again
+        assert await admission.acquire(max_wait=0)
+        admission.release()
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats == {"limit": 1, "in_flight": 0, "waiting": 0, "admitted": 2, "rejected": 2}
+
+
+def test_middleware_sheds_requests_over_the_limit_with_503(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_LIMITS", {"read": 1})
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_SIZE", 0)
+    monkeypatch.setattr(settings, "ADMISSION_RETRY_AFTER_SECONDS", 3)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        middleware = AdmissionControlMiddleware(app)
+        scope = {"type": "http", "method": "GET", "path": f"{settings.API_V1_PREFIX}/profile/me"}
+        first, second = [], []
+
+        def send_to(messages):
+            async def send(message):
+                messages.append(message)
+            return send
+
+        admitted = asyncio.create_task(middleware(scope, None, send_to(first)))
+        await asyncio.sleep(0)
+        await middleware(scope, None, send_to(second))
+        release.set()
+        await admitted
+        return first, second, middleware.classes["read"].stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert first[0]["status"] == 200
+    assert second[0]["status"] == 503
+    assert (b"retry-after", b"3") in second[0]["headers"]
+    assert (stats["admitted"], stats["rejected"], stats["in_flight"]) == (1, 1, 0)
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.core.security import _upsert_login_user
+
+
+def test_login_upsert_returns_existing_users_without_touching_last_login(pg_database):
+    async def scenario():
+        async with pg_database() as db:
+            created = await _upsert_login_user(db, "uid-login", "login@example.com")
+            await db.execute(
+                "UPDATE users SET last_login = '2020-01-01T00:00:00Z' WHERE id = $1", created["id"]
+            )
+            again = await _upsert_login_user(db, "uid-login", "login@example.com")
+            last_login = await db.fetch_val("SELECT last_login FROM users WHERE id = $1", created["id"])
+            return created, again, last_login
+
+    created, again, last_login = asyncio.run(scenario())
+    assert created["created"] is True
+    assert again["created"] is False
+    assert again["id"] == created["id"]
+    assert last_login.year == 2020
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+
+from app.core.database import user_id_for_uid
+from app.core.rank_index import RankIndex
+from app.schemas.bulk_import import BulkImportRequest
+from app.services import import_service
+from app.services.import_service import BulkImportService
+
+
+def test_import_stages_and_merges_per_shard_skipping_taken_emails(pg_database, monkeypatch):
+    legacy_id = str(uuid.uuid4())
+    request = BulkImportRequest(
+        users=[
+            {"firebase_uid": "uid-existing", "email": "taken@example.com", "display_name": "Renamed"},
+            {"firebase_uid": "uid-new", "email": "new@example.com"},
+            {"firebase_uid": "uid-taken", "email": "taken@example.com"},
+            {"firebase_uid": "uid-duplicate", "email": "new@example.com"},
+        ],
+        profiles=[{"firebase_uid": "uid-new", "bio": "imported", "skills": ["sql"]}],
+        lifescores=[
+            {"firebase_uid": "uid-existing", "composite_score": 40},
+            {"firebase_uid": "uid-new", "composite_score": 60},
+            {"firebase_uid": "uid-taken", "composite_score": 90},
+        ],
+    )
+
+    async def scenario():
+        async with pg_database(shards=2) as db:
+            monkeypatch.setattr(import_service, "rank_index", RankIndex(db))
+            # A legacy user on shard-0 whatever its id hashes to
+            async with db.get_connection(db.pool) as conn:
+                await conn.execute(
+                    "INSERT INTO users (id, firebase_uid, email) VALUES ($1, $2, $3)",
+                    legacy_id, "uid-existing", "taken@example.com"
+                )
+
+            result = await BulkImportService(db).import_cohort(request)
+
+            users = {}
+            for shard, rows in (await db.fetch_by_shard(
+                "SELECT u.id, u.firebase_uid, u.display_name, p.bio, l.composite_score, l.rank "
+                "FROM users u LEFT JOIN profiles p ON p.user_id = u.id "
+                "LEFT JOIN lifescore_history l ON l.user_id = u.id"
+            )).items():
+                for row in rows:
+                    users[row["firebase_uid"]] = {**row, "shard": shard}
+            return db.shard_router.shard_for(user_id_for_uid("uid-new")), result, users
+
+    new_user_shard, result, users = asyncio.run(scenario())
+
+    assert result["users"] == {
+        "created": 1,
+        "updated": 1,
+        "staged": 4,
+        "skipped_email_conflicts": 2,
+        "email_conflicts": ["uid-taken", "uid-duplicate"],
+    }
+    assert result["profiles"]["created"] == 1
+    assert result["lifescores"]["created"] == 2
+
+    assert set(users) == {"uid-existing", "uid-new"}
+    assert users["uid-existing"]["shard"] == "shard-0"
+    assert users["uid-existing"]["id"] == legacy_id
+    assert users["uid-existing"]["display_name"] == "Renamed"
+    assert users["uid-new"]["shard"] == new_user_shard
+    assert users["uid-new"]["id"] == user_id_for_uid("uid-new")
+    assert users["uid-new"]["bio"] == "imported"
+    assert float(users["uid-new"]["composite_score"]) == 60
+    # Ranked across both shards by the rank index load
+    assert (users["uid-new"]["rank"], users["uid-existing"]["rank"]) == (1, 2)
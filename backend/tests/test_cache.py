@@ -0,0 +1,76 @@
+import asyncio
+
+from app.core import cache
+from app.core.cache import LRUCache, UserRecordCache
+from app.repositories.user_repository import UserRepository
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    stats = lru.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+
+
+def test_lru_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("ttl", 1)
+    lru.set("explicit", 2, expires_at=1010)
+
+    now[0] = 1030
+    assert (lru.get("ttl"), lru.get("explicit"), lru.peek("explicit")) == (1, None, None)
+    now[0] = 1061
+    assert lru.get("ttl") is None
+    assert len(lru) == 0
+
+
+def test_user_cache_invalidates_by_user_id():
+    users = UserRecordCache(maxsize=10, ttl=60)
+    users.set("uid-1", {"id": "user-1", "role": "user"})
+    users.set("uid-2", {"id": "user-2", "role": "user"})
+
+    users.invalidate_user("user-1")
+    users.invalidate_user("unknown")
+
+    assert users.get("uid-1") is None
+    assert users.get("uid-2") == {"id": "user-2", "role": "user"}
+
+
+def test_user_update_invalidates_the_cache_after_the_write(make_db, monkeypatch):
+    users = UserRecordCache(maxsize=10, ttl=60)
+    monkeypatch.setattr("app.repositories.user_repository.user_cache", users)
+    cached_during_write = []
+
+    def handler(sql, args):
+        if "UPDATE users" in sql:
+            cached_during_write.append(users.peek("uid-1") is not None)
+            return [{"id": "user-1", "role": "admin"}]
+        return []
+
+    db = make_db({"shard-0": handler})
+
+    async def update(conn):
+        users.set("uid-1", {"id": "user-1", "role": "user"})
+        await UserRepository(conn).update("user-1", role="admin")
+        return users.peek("uid-1")
+
+    assert asyncio.run(update(db)) is None
+
+    async def update_in_transaction():
+        async with db.unit_of_work(transactional=True) as uow:
+            users.set("uid-1", {"id": "user-1", "role": "user"})
+            await UserRepository(uow).update("user-1", role="admin")
+            before_commit = users.peek("uid-1")
+        return before_commit, users.peek("uid-1")
+
+    before_commit, after_commit = asyncio.run(update_in_transaction())
+    assert before_commit is not None and after_commit is None
+    assert cached_during_write == [True, True]
@@ -0,0 +1,35 @@
+import asyncio
+import uuid
+
+from app.core.queries import queries
+
+
+def test_uuid_columns_accept_copy_and_read_back_as_strings(pg_database):
+    user_id = str(uuid.uuid4())
+
+    async def scenario():
+        async with pg_database() as db:
+            async with db.get_connection() as conn:
+                await conn.copy_records_to_table(
+                    "users",
+                    records=[(user_id, "uid-copy", "copy@example.com")],
+                    columns=["id", "firebase_uid", "email"],
+                )
+                # Parameters take strings or UUIDs; results come back as strings
+                by_str = await conn.fetchval("SELECT id FROM users WHERE id = $1", user_id)
+                by_uuid = await conn.fetchval("SELECT id FROM users WHERE id = $1", uuid.UUID(user_id))
+            return by_str, by_uuid
+
+    by_str, by_uuid = asyncio.run(scenario())
+    assert by_str == by_uuid == user_id
+
+
+def test_named_queries_survive_pool_checkouts(pg_database):
+    count_users = queries.register("tests.count_users", "SELECT COUNT(*) FROM users")
+
+    async def scenario():
+        async with pg_database() as db:
+            # Pool size 2: later calls reuse connections released by earlier ones
+            return [await db.fetch_val(count_users) for _ in range(5)]
+
+    assert asyncio.run(scenario()) == [0] * 5
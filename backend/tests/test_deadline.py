@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import jwt
+import pytest
+
+from app.config.settings import settings
+from app.core import deadline, firebase
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware
+from app.core.firebase import FirebaseAuth
+from fakes import FakeConnection, FakePool
+
+
+def set_deadline(seconds: float):
+    deadline._deadline.set(time.monotonic() + seconds)
+
+
+def test_budget_is_capped_by_the_remaining_time():
+    async def scenario():
+        without = (deadline.remaining(), deadline.budget(5), deadline.expired())
+        set_deadline(2)
+        within = (deadline.budget(5), deadline.budget(1), deadline.budget(None))
+        set_deadline(-1)
+        return without, within, deadline.expired()
+
+    without, (capped, cap, uncapped), expired = asyncio.run(scenario())
+    assert without == (None, 5, False)
+    assert 1.9 < capped <= 2 and cap == 1 and 1.9 < uncapped <= 2
+    assert expired
+    assert deadline._deadline.get() is None
+
+
+def test_spent_budget_raises_before_the_call():
+    async def scenario():
+        set_deadline(-1)
+        deadline.budget(5)
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(scenario())
+    assert error.value.status_code == 504
+
+
+def test_middleware_sets_route_deadlines_and_answers_504(monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.05)
+    middleware = DeadlineMiddleware(app=None)
+    prefix = settings.API_V1_PREFIX
+    assert middleware.deadline_for("POST", f"{prefix}/admin/import") == 300.0
+    assert middleware.deadline_for("GET", f"{prefix}/admin/export/users") is None
+    assert middleware.deadline_for("GET", f"{prefix}/profile/me") == 0.05
+
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(deadline.remaining())
+        await asyncio.sleep(1)
+
+    async def scenario():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await DeadlineMiddleware(app)({"type": "http", "method": "GET", "path": f"{prefix}/profile/me"}, None, send)
+        return messages
+
+    start = time.monotonic()
+    messages = asyncio.run(scenario())
+    assert time.monotonic() - start < 0.5
+    assert 0 < seen[0] <= 0.05
+    assert messages[0]["status"] == 504
+
+
+class SlowConnection(FakeConnection):
+    async def fetch(self, sql, *args, timeout=None):
+        self.pool.queries.append((sql, timeout))
+        await asyncio.wait_for(asyncio.sleep(1), timeout)
+        return []
+
+
+class SlowPool(FakePool):
+    async def acquire(self, timeout=None):
+        return SlowConnection(self)
+
+
+def test_database_queries_are_bounded_by_the_deadline(make_db):
+    db = make_db({"shard-0": lambda sql, args: []})
+    db.pool = SlowPool("shard-0")
+
+    async def scenario():
+        set_deadline(0.05)
+        await db.fetch_all("SELECT 1")
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    (sql, timeout), = db.pool.queries
+    assert 0 < timeout <= 0.05
+
+
+def test_postgres_statement_is_cancelled_at_the_deadline(pg_database):
+    async def scenario():
+        async with pg_database() as db:
+            set_deadline(0.2)
+            await db.fetch_val("SELECT pg_sleep(5)")
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    assert time.monotonic() - start < 4
+
+
+def test_firebase_verification_lets_the_deadline_escape(monkeypatch):
+    monkeypatch.setattr(firebase.auth, "verify_id_token", lambda token: time.sleep(0.3))
+    firebase_auth = FirebaseAuth()
+    firebase_auth._initialized = True
+    # No signing keys loaded yet: verification falls back to the Admin SDK call
+    token = jwt.encode({"sub": "uid-1"}, "secret", algorithm="HS256", headers={"kid": "unknown"})
+
+    async def scenario():
+        assert await firebase_auth.verify_token("not-a-jwt") is None
+        set_deadline(0.05)
+        await firebase_auth.verify_token(token)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.database import Database
+from app.core.metrics import Counter, MetricsRegistry, metrics
+
+
+def test_database_instances_do_not_register_more_pool_gauges():
+    before = metrics.render()
+    Database()
+    Database()
+
+    rendered = metrics.render()
+    assert rendered == before
+    assert rendered.count("# TYPE db_pool_connections gauge") == 1
+
+
+def test_registering_a_metric_name_twice_fails():
+    registry = MetricsRegistry()
+    registry.register(Counter("requests_total", "Requests"))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("requests_total", "Requests again"))
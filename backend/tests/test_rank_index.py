@@ -0,0 +1,83 @@
+import asyncio
+import random
+from decimal import Decimal
+
+from app.core.rank_index import FenwickTree, RankIndex, score_bucket
+
+
+def loaded_index(scores: dict) -> RankIndex:
+    index = RankIndex(db=None)
+    index.loaded_at = 0.0
+    for user_id, score in scores.items():
+        index.update(user_id, score)
+    return index
+
+
+def test_fenwick_prefix_sums_match_the_counts():
+    counts = [random.Random(7).randint(0, 5) for _ in range(50)]
+    tree = FenwickTree.from_counts(counts)
+    assert [tree.prefix_sum(i) for i in range(-1, 50)] == [0] + [sum(counts[:i + 1]) for i in range(50)]
+
+    tree.add(10, 3)
+    assert tree.prefix_sum(9) == sum(counts[:10])
+    assert tree.prefix_sum(10) == sum(counts[:11]) + 3
+
+
+def test_ties_share_a_rank_and_percentile_matches_percent_rank():
+    index = loaded_index({"a": 90, "b": 75.5, "c": Decimal("75.50"), "d": 10, "e": 0})
+
+    assert index.position(90) == (1, 100.0)
+    assert index.position(75.5) == (2, 50.0)
+    assert index.position(10) == (4, 25.0)
+    assert index.position(0) == (5, 0.0)
+    assert index.position(None) == (None, None)
+    assert RankIndex(db=None).position(50) == (None, None)
+
+
+def test_position_if_leaves_the_index_unchanged():
+    index = loaded_index({"a": 90, "b": 50})
+
+    assert index.position_if("b", 95) == (1, 100.0)
+    assert index.position_if("c", 70) == (2, 50.0)
+    assert index._buckets == {"a": score_bucket(90), "b": score_bucket(50)}
+    assert index.position(50) == (2, 0.0)
+
+
+def test_load_keeps_updates_and_stores_only_changed_positions(make_db):
+    written = []
+
+    def shard_0(sql, args):
+        if "DISTINCT ON" in sql:
+            index.update("late", 99)
+            return [
+                {"id": "s-a", "user_id": "a", "composite_score": Decimal("80.00"), "rank": 2, "percentile": Decimal("100.00")},
+                {"id": "s-b", "user_id": "b", "composite_score": Decimal("40.00"), "rank": 3, "percentile": Decimal("0.00")},
+            ]
+        if "UPDATE lifescore_history" in sql:
+            written.append(("shard-0", *args))
+        return []
+
+    def shard_1(sql, args):
+        if "DISTINCT ON" in sql:
+            return [{"id": "s-c", "user_id": "c", "composite_score": Decimal("60.00"), "rank": 3, "percentile": Decimal("66.67")}]
+        if "UPDATE lifescore_history" in sql:
+            written.append(("shard-1", *args))
+        return []
+
+    index = RankIndex(make_db({"shard-0": shard_0, "shard-1": shard_1}))
+    asyncio.run(index.load())
+
+    # The score recorded while loading survives the rebuild
+    assert len(index) == 4
+    assert index.position(99) == (1, 100.0)
+    # a: stored (2, 100.0) is now (2, 66.67); b: (3, 0.0) is now (4, 0.0); c: (3, 66.67) is now (3, 33.33)
+    assert sorted(written) == [
+        ("shard-0", ["s-a", "s-b"], [2, 4], [66.67, 0.0]),
+        ("shard-1", ["s-c"], [3], [33.33]),
+    ]
+
+    written.clear()
+    asyncio.run(index._persist({"shard-0": [
+        {"id": "s-a", "user_id": "a", "composite_score": 80, "rank": 2, "percentile": Decimal("66.67")},
+    ]}))
+    assert written == []
@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import time
+
+from app.config.settings import settings
+from app.core import rate_limit
+from app.core.cache import LRUCache
+from app.core.rate_limit import MemoryBucketStore, RateLimitMiddleware
+
+
+def test_memory_buckets_refill_and_forget_the_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    store = MemoryBucketStore(max_keys=2)
+
+    async def scenario():
+        results = [await store.consume("a", 1, capacity=2, rate=1) for _ in range(3)]
+        now[0] += 1.5
+        results.append(await store.consume("a", 1, capacity=2, rate=1))
+        await store.consume("b", 1, capacity=2, rate=1)
+        # "a" was used after "b" was created: "b" is the least recently used now
+        await store.consume("a", 1, capacity=2, rate=1)
+        await store.consume("c", 1, capacity=2, rate=1)
+        return results
+
+    assert asyncio.run(scenario()) == [(True, 1), (True, 0), (False, 0), (True, 0.5)]
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_only_verified_tokens_get_a_user_bucket(monkeypatch):
+    tokens = LRUCache(maxsize=10)
+    tokens.set(hashlib.sha256(b"verified").hexdigest(), {"uid": "uid-1"}, expires_at=time.time() + 60)
+    monkeypatch.setattr(rate_limit, "token_cache", tokens)
+    middleware = RateLimitMiddleware(app=None)
+
+    def key(authorization=None):
+        headers = [(b"authorization", authorization)] if authorization else []
+        return middleware._bucket_key({"headers": headers, "client": ("10.0.0.1", 5000)})
+
+    assert key(b"Bearer verified") == "user:uid-1"
+    assert key(b"Bearer made-up") == "ip:10.0.0.1"
+    assert key() == "ip:10.0.0.1"
+    assert middleware._bucket_key({"headers": []}) == "ip:unknown"
+
+
+def test_middleware_charges_route_costs_and_answers_429(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 12)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTE_COSTS", {"POST /lifescore/calculate": 5})
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    middleware = RateLimitMiddleware(app)
+
+    async def request(method, path):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.2", 1)}
+        await middleware(scope, None, send)
+        return messages[0]
+
+    async def scenario():
+        calculate = f"{settings.API_V1_PREFIX}/lifescore/calculate"
+        responses = [await request("POST", calculate) for _ in range(3)]
+        responses.append(await request("GET", "/health"))
+        responses.append(await request("GET", f"{settings.API_V1_PREFIX}/profile/me"))
+        return responses
+
+    first, second, limited, health, cheap = asyncio.run(scenario())
+    assert [first["status"], second["status"], limited["status"], health["status"], cheap["status"]] == [
+        200, 200, 429, 200, 200
+    ]
+    headers = dict(limited["headers"])
+    assert headers[b"ratelimit-remaining"] == b"2"
+    # 3 more tokens at 12 per minute
+    assert headers[b"retry-after"] == b"15"
+    assert (b"ratelimit-remaining", b"1") in cheap["headers"]
+    assert health["headers"] == []
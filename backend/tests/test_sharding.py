@@ -0,0 +1,333 @@
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app import rebalance_shards
+from app.core.database import (
+    ShardRouter, UnitOfWork, _shard_name, all_shards, set_request_user, use_shard, user_id_for_uid
+)
+from app.core.security import _upsert_login_user
+from app.repositories.lifescore_repository import LifeScoreRepository
+from app.repositories.portfolio_repository import PortfolioRepository
+from app.repositories.user_repository import UserRepository
+from app.schemas.bulk_import import BulkImportRequest
+from app.services.import_service import BulkImportService
+from fakes import pool_hits, uid_on_shard
+
+SHARDS = ["shard-0", "shard-1", "shard-2"]
+
+
+def user_ids(count: int):
+    return [user_id_for_uid(f"uid-{index}") for index in range(count)]
+
+
+def test_shard_router_is_deterministic_and_spreads_users():
+    router = ShardRouter(SHARDS)
+    ids = user_ids(3000)
+
+    assert [router.shard_for(user_id) for user_id in ids] == [ShardRouter(SHARDS).shard_for(user_id) for user_id in ids]
+    counts = Counter(router.shard_for(user_id) for user_id in ids)
+    assert set(counts) == set(SHARDS)
+    assert min(counts.values()) > 3000 / len(SHARDS) * 0.6
+
+
+def test_adding_a_shard_moves_about_one_nth_of_users_to_the_new_shard_only():
+    before, after = ShardRouter(SHARDS), ShardRouter([*SHARDS, "shard-3"])
+    ids = user_ids(4000)
+
+    moved = [user_id for user_id in ids if before.shard_for(user_id) != after.shard_for(user_id)]
+    assert all(after.shard_for(user_id) == "shard-3" for user_id in moved)
+    assert 0.15 < len(moved) / len(ids) < 0.35
+
+
+def test_scatter_concatenates_rows_from_every_shard(make_db):
+    db = make_db({name: (lambda sql, args, name=name: [{"shard": name}]) for name in SHARDS})
+
+    @all_shards
+    async def fetch():
+        return await db.fetch_all("SELECT shard")
+
+    rows = asyncio.run(fetch())
+    assert sorted(row["shard"] for row in rows) == SHARDS
+
+
+def test_scatter_takes_the_first_non_null_row_and_value(make_db):
+    db = make_db({
+        "shard-0": lambda sql, args: [],
+        "shard-1": lambda sql, args: [{"id": "found"}],
+        "shard-2": lambda sql, args: [],
+    })
+
+    @all_shards
+    async def lookup():
+        return await db.fetch_one("SELECT id"), await db.fetch_val("SELECT id")
+
+    assert asyncio.run(lookup()) == ({"id": "found"}, "found")
+
+
+def test_sharded_methods_query_only_the_owning_shard(make_db):
+    db = make_db({name: (lambda sql, args: [{"id": args[0], "composite_score": 1}]) for name in SHARDS})
+    user_id = user_id_for_uid(uid_on_shard(db, "shard-2"))
+
+    async def run():
+        await UserRepository(db).get_by_id(user_id)
+        await UserRepository(db).get_stats(user_id)
+        await PortfolioRepository(db).get_latest_score_details(user_id)
+
+    asyncio.run(run())
+    assert pool_hits(db) == {"shard-0": 0, "shard-1": 0, "shard-2": 3}
+
+
+def test_use_shard_overrides_the_shard_key_and_scatter(make_db):
+    db = make_db({name: (lambda sql, args: []) for name in SHARDS})
+    user_id = user_id_for_uid(uid_on_shard(db, "shard-2"))
+
+    @all_shards
+    async def scatter():
+        await db.fetch_all("SELECT 1")
+
+    async def run():
+        with use_shard("shard-1"):
+            await UserRepository(db).get_by_id(user_id)
+            await scatter()
+
+    asyncio.run(run())
+    assert pool_hits(db) == {"shard-0": 0, "shard-1": 2, "shard-2": 0}
+
+
+def test_unit_of_work_follows_a_use_shard_pin_over_the_request_user(make_db):
+    db = make_db({name: (lambda sql, args: []) for name in SHARDS})
+    set_request_user(user_id_for_uid(uid_on_shard(db, "shard-2")))
+
+    async def run():
+        with use_shard("shard-1"):
+            async with db.unit_of_work() as uow:
+                await uow.fetch_all("SELECT 1")
+        async with db.unit_of_work() as uow:
+            await uow.fetch_all("SELECT 1")
+
+    try:
+        asyncio.run(run())
+    finally:
+        set_request_user(None)
+    assert pool_hits(db) == {"shard-0": 0, "shard-1": 1, "shard-2": 1}
+
+
+def test_unit_of_work_runs_after_commit_callbacks_only_on_commit(make_db):
+    db = make_db({name: (lambda sql, args: []) for name in SHARDS})
+    calls = []
+
+    async def run():
+        committed = UnitOfWork(db, transactional=True)
+        committed.after_commit(lambda: calls.append("committed"))
+        await committed.close(commit=True)
+        rolled_back = UnitOfWork(db, transactional=True)
+        rolled_back.after_commit(lambda: calls.append("rolled back"))
+        await rolled_back.close(commit=False)
+
+    asyncio.run(run())
+    assert calls == ["committed"]
+
+
+def login_handler(holder: str, name: str, existing_id: str, uid: str):
+    def handler(sql, args):
+        if "INSERT INTO users" in sql:
+            return [{"id": args[2], "firebase_uid": args[0], "email": args[1], "role": "user",
+                     "is_active": True, "is_banned": False, "created": name != holder}]
+        if "WHERE firebase_uid = $1" in sql and name == holder and args[0] == uid:
+            return [{"id": existing_id, "firebase_uid": uid, "email": "user@example.com", "role": "user",
+                     "is_active": True, "is_banned": False}]
+        return []
+    return handler
+
+
+def inserts(db):
+    pools = {"shard-0": db.pool, **db.shards}
+    return {name: [args for sql, args in pool.queries if "INSERT INTO users" in sql] for name, pool in pools.items()}
+
+
+def test_login_reads_an_existing_user_from_its_hash_shard_only(make_db):
+    db = make_db({name: (lambda sql, args: []) for name in SHARDS})
+    uid = uid_on_shard(db, "shard-2", "existing")
+    user_id = user_id_for_uid(uid)
+    db = make_db({name: login_handler("shard-2", name, user_id, uid) for name in SHARDS})
+
+    user = asyncio.run(_upsert_login_user(db, uid, "user@example.com"))
+
+    assert user["id"] == user_id and user["created"] is False
+    assert pool_hits(db) == {"shard-0": 0, "shard-1": 0, "shard-2": 1}
+
+
+def test_login_finds_a_legacy_user_on_another_shard_without_writing(make_db):
+    # A user created before sharding keeps a random id on shard-0 until the rebalance
+    uid, existing_id = "legacy-uid", "00000000-0000-0000-0000-000000000001"
+    db = make_db({name: login_handler("shard-0", name, existing_id, uid) for name in SHARDS})
+    assert db.shard_router.shard_for(user_id_for_uid(uid)) != "shard-0"
+
+    user = asyncio.run(_upsert_login_user(db, uid, "legacy@example.com"))
+
+    assert user["id"] == existing_id and user["created"] is False
+    assert inserts(db) == {"shard-0": [], "shard-1": [], "shard-2": []}
+
+
+def test_login_creates_a_new_user_on_its_hash_shard(make_db):
+    db = make_db({name: login_handler("none", name, "", "") for name in SHARDS})
+    uid = uid_on_shard(db, "shard-1", "new")
+
+    user = asyncio.run(_upsert_login_user(db, uid, "new@example.com"))
+
+    assert user["id"] == user_id_for_uid(uid)
+    assert [name for name, rows in inserts(db).items() if rows] == ["shard-1"]
+
+
+def test_leaderboard_merges_shard_top_lists_and_reranks(make_db):
+    scores = {"shard-0": [90.0, 40.0, None], "shard-1": [75.0, 60.0], "shard-2": [95.0]}
+    db = make_db({
+        name: (lambda sql, args, name=name: [
+            {"id": f"{name}-{index}", "lifescore": score, "rank": 1} for index, score in enumerate(scores[name])
+        ])
+        for name in SHARDS
+    })
+
+    rows = asyncio.run(LifeScoreRepository(db).get_leaderboard(limit=4))
+
+    assert [(row["lifescore"], row["rank"]) for row in rows] == [(95.0, 1), (90.0, 2), (75.0, 3), (60.0, 4)]
+
+
+def test_admin_score_list_merges_shard_top_lists(make_db):
+    scores = {"shard-0": [50, None], "shard-1": [90, 10], "shard-2": [70]}
+    db = make_db({
+        name: (lambda sql, args, values=values: [{"id": f"{value}", "lifescore": value} for value in values])
+        for name, values in scores.items()
+    })
+
+    rows = asyncio.run(LifeScoreRepository(db).get_all_scores(limit=3))
+    assert [row["lifescore"] for row in rows] == [90, 70, 50]
+
+    rows = asyncio.run(LifeScoreRepository(db).get_all_scores(limit=10))
+    assert [row["lifescore"] for row in rows] == [90, 70, 50, 10, None]
+
+
+def test_exports_stream_every_shard_in_turn(make_db):
+    db = make_db({name: (lambda sql, args, name=name: [{"shard": name, "row": i} for i in range(2)]) for name in SHARDS})
+
+    async def collect(records):
+        return [(row["shard"], row["row"]) for row in [record async for record in await records]]
+
+    users = asyncio.run(collect(UserRepository(db).export_all()))
+    scores = asyncio.run(collect(LifeScoreRepository(db).export_scores()))
+    expected = [(name, i) for name in SHARDS for i in range(2)]
+    assert users == scores == expected
+
+
+def test_user_list_pages_across_shards_by_created_at(make_db):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    created = {name: [start + timedelta(days=day) for day in range(offset, 12, 3)] for offset, name in enumerate(SHARDS)}
+
+    def handler(name):
+        def rows(sql, args):
+            newest = sorted(created[name], reverse=True)[args[1]:args[1] + args[0]]
+            return [{"id": f"{name}-{at.day}", "created_at": at} for at in newest]
+        return rows
+
+    db = make_db({name: handler(name) for name in SHARDS})
+
+    page = asyncio.run(UserRepository(db).get_all(limit=4, offset=3))
+
+    expected = sorted((at for ats in created.values() for at in ats), reverse=True)[3:7]
+    assert [row["created_at"] for row in page] == expected
+
+
+def test_bulk_import_merges_each_user_on_its_own_shard(make_db):
+    legacy = "legacy-uid"
+    db = make_db({
+        name: (lambda sql, args, name=name: [
+            {"id": "legacy-id", "firebase_uid": legacy, "email": "legacy@example.com"}
+        ] if name == "shard-2" and legacy in args[0] else [])
+        for name in SHARDS
+    })
+    new_uids = {name: uid_on_shard(db, name, "new") for name in SHARDS}
+    service = BulkImportService(db)
+    merged = {}
+
+    async def import_shard(tables):
+        merged[_shard_name.get()] = sorted(row["firebase_uid"] for row in tables["import_users"])
+        return {"users": {"created": 0, "updated": 0}, "profiles": {"created": 0, "updated": 0},
+                "cognitive_scores": {"created": 0}, "lifescores": {"created": 0}}
+
+    service._import_shard = import_shard
+    users = [{"firebase_uid": uid, "email": f"{uid}@example.com"} for uid in [legacy, *new_uids.values()]]
+    asyncio.run(service.import_cohort(BulkImportRequest(users=users)))
+
+    assert merged == {
+        "shard-0": [new_uids["shard-0"]],
+        "shard-1": [new_uids["shard-1"]],
+        "shard-2": sorted([legacy, new_uids["shard-2"]]),
+    }
+
+
+
+async def seed_user(conn, user_id: str, test_id: str, lifescore_id: str):
+    """A user with rows in most per-user tables"""
+    await conn.execute(
+        "INSERT INTO users (id, firebase_uid, email) VALUES ($1, 'uid-moved', 'moved@example.com')", user_id
+    )
+    await conn.execute("INSERT INTO profiles (user_id, bio, skills) VALUES ($1, 'moving', ARRAY['sql'])", user_id)
+    await conn.execute(
+        "INSERT INTO sessions (user_id, token_hash, expires_at) VALUES ($1, 'hash', NOW() + INTERVAL '1 day')", user_id
+    )
+    await conn.execute(
+        "INSERT INTO cognitive_tests (id, user_id, test_type, status) VALUES ($1, $2, 'memory', 'completed')",
+        test_id, user_id
+    )
+    await conn.execute(
+        "INSERT INTO cognitive_scores (user_id, test_id, accuracy_score, speed_score, difficulty_score, "
+        "composite_score) VALUES ($1, $2, 80, 70, 60, 72.5)",
+        user_id, test_id
+    )
+    await conn.execute(
+        "INSERT INTO lifescore_history (id, user_id, composite_score, score_breakdown) VALUES ($1, $2, 72.5, $3)",
+        lifescore_id, user_id, {"cognitive": 72.5}
+    )
+    await conn.execute(
+        "INSERT INTO certificates (user_id, lifescore_id, certificate_hash, score) VALUES ($1, $2, 'cert', 72.5)",
+        user_id, lifescore_id
+    )
+
+
+def test_rebalance_moves_a_misplaced_user_with_all_their_rows(pg_database, monkeypatch):
+    test_id, lifescore_id = str(uuid.uuid4()), str(uuid.uuid4())
+    tables = ["users", "profiles", "sessions", "cognitive_tests", "cognitive_scores", "lifescore_history", "certificates"]
+
+    async def row_counts(db, shard: str, user_id: str) -> dict:
+        with use_shard(shard):
+            return {
+                table: await db.fetch_val(
+                    f"SELECT COUNT(*) FROM {table} WHERE {'id' if table == 'users' else 'user_id'} = $1", user_id
+                )
+                for table in tables
+            }
+
+    async def scenario():
+        async with pg_database(shards=2) as db:
+            monkeypatch.setattr(rebalance_shards, "db", db)
+            user_id = user_id_for_uid(uid_on_shard(db, "shard-1"))
+            async with db.get_connection(db.shard_pool("shard-0")) as conn:
+                await seed_user(conn, user_id, test_id, lifescore_id)
+            # A partial copy left on the target by an interrupted run is replaced
+            async with db.get_connection(db.shard_pool("shard-1")) as conn:
+                await conn.execute(
+                    "INSERT INTO users (id, firebase_uid, email) VALUES ($1, 'uid-moved', 'moved@example.com')", user_id
+                )
+
+            moves = await rebalance_shards.rebalance()
+            located = await db.locate("SELECT lifescore_id FROM certificates WHERE user_id = $1", user_id)
+            return moves, await row_counts(db, "shard-0", user_id), await row_counts(db, "shard-1", user_id), located
+
+    moves, source, target, (shard, certificate) = asyncio.run(scenario())
+    assert moves == Counter({("shard-0", "shard-1"): 1})
+    assert set(source.values()) == {0}
+    assert set(target.values()) == {1}
+    assert shard == "shard-1"
+    assert certificate["lifescore_id"] == lifescore_id